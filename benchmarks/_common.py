@@ -0,0 +1,49 @@
+"""
+timing and reporting shared by the benchmarks, so all of them print the same fields.
+
+every result is one json object per line: the fields naming what was measured, then
+repeat, median_ms, p90_ms, p99_ms, min_ms and max_ms.
+"""
+
+import json
+import time
+import statistics
+
+
+def time_calls(function, repeat: int, setup=None) -> list[float]:
+    """
+    seconds taken by each of `repeat` calls of `function`. `setup` runs before each call, untimed
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summary(timings: list[float]) -> dict[str, float]:
+    timings_ms = [t * 1000 for t in timings]
+    percentiles = (
+        statistics.quantiles(timings_ms, n=100, method="inclusive")
+        if len(timings_ms) > 1
+        else timings_ms * 99
+    )
+    return {
+        "median_ms": round(statistics.median(timings_ms), 3),
+        "p90_ms": round(percentiles[89], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "min_ms": round(min(timings_ms), 3),
+        "max_ms": round(max(timings_ms), 3),
+    }
+
+
+def report(timings: list[float], **fields):
+    """
+    print one result, `fields` followed by the summary of `timings`
+    """
+    print(
+        json.dumps({**fields, "repeat": len(timings), **summary(timings)}), flush=True
+    )
@@ -0,0 +1,125 @@
+"""
+compare loading the command metadata from the binary cache against the previous
+json + dacite cache (metadata_dict.json).
+
+cold: a fresh interpreter imports the loader and loads the cache once
+warm: the cache is loaded again inside an interpreter that already did it
+
+usage: python benchmarks/bench_metadata_cache.py [--commands 300] [--repeat 20]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+SRC_FOLDER = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_FOLDER))
+
+from _common import report, time_calls
+from archdots.argparsing import METADATA_CACHE_VERSION
+from archdots.cache import dump_cache
+from archdots.schema import Argument, Flag, Metadata, ExtendedJSONEncoder
+
+
+def sample_metadata(i: int) -> Metadata:
+    return Metadata(
+        help=f"synthetic command {i}",
+        arguments=[
+            Argument(name="target", help="target of the command", required=True),
+            Argument(name="kind", help="kind", choices=["pkgs", "dots"], nargs="?"),
+        ],
+        flags=[
+            Flag(long="--filter", help="filter by package manager", nargs="+"),
+            Flag(long="--raw", short="-r", help="raw output", type="bool"),
+        ],
+    )
+
+
+JSON_LOADER = """
+import json
+from dacite import from_dict
+from archdots.schema import Metadata
+
+def load(path):
+    with open(path, "r") as f:
+        metadata_dict = json.load(f)
+    return {{k: from_dict(Metadata, v) for k, v in metadata_dict.items()}}
+"""
+
+BINARY_LOADER = """
+from archdots.cache import load_cache
+
+def load(path):
+    return load_cache(path, {version})
+"""
+
+COLD_SNIPPET = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+{loader}
+load({path!r})
+print(time.perf_counter() - start)
+"""
+
+
+def time_cold(loader: str, path: Path, repeat: int) -> list[float]:
+    snippet = COLD_SNIPPET.format(src=str(SRC_FOLDER), loader=loader, path=str(path))
+    return [
+        float(subprocess.check_output([sys.executable, "-c", snippet], text=True))
+        for _ in range(repeat)
+    ]
+
+
+def time_warm(loader: str, path: Path, repeat: int) -> list[float]:
+    namespace: dict = {}
+    exec(loader, namespace)
+    namespace["load"](path)
+    return time_calls(lambda: namespace["load"](path), repeat)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argparser.add_argument("--commands", type=int, default=300)
+    argparser.add_argument("--repeat", type=int, default=20)
+    options = argparser.parse_args()
+
+    metadata = {f"archdots/cmd{i}": sample_metadata(i) for i in range(options.commands)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "metadata_dict.json"
+        with open(json_path, "w") as f:
+            json.dump(metadata, f, cls=ExtendedJSONEncoder)
+
+        binary_path = Path(tmp) / "metadata.cache"
+        dump_cache(
+            binary_path,
+            METADATA_CACHE_VERSION,
+            {path: (0.0, 0, m) for path, m in metadata.items()},
+        )
+
+        loaders = {
+            "json+dacite": (JSON_LOADER.format(), json_path),
+            "binary": (
+                BINARY_LOADER.format(version=METADATA_CACHE_VERSION),
+                binary_path,
+            ),
+        }
+
+        for name, (loader, path) in loaders.items():
+            for state, timer in (("cold", time_cold), ("warm", time_warm)):
+                report(
+                    timer(loader, path, options.repeat),
+                    format=name,
+                    state=state,
+                    commands=options.commands,
+                    size_bytes=os.path.getsize(path),
+                )
+
+
+if __name__ == "__main__":
+    main()
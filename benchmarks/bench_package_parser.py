@@ -0,0 +1,149 @@
+"""
+measure the PKGBUILD parser used on windows (archdots.package_parser) over large synthetic PKGBUILDs.
+
+--pkgbuilds PKGBUILDs are generated, each with --functions powershell functions of about --lines lines. it times
+ - construct: Earley (the previous parser), LALR without cache and LALR loaded from PARSER_CACHE
+ - parse: every PKGBUILD with Earley and LALR, after checking that both give the same fields and functions
+ - run_functions: looking up every function of every PKGBUILD, by parsing the PKGBUILD each time
+   as _run_pkgbuild_function did, and with the memoized `find_function`
+
+results are printed as one json object per line, with times in milliseconds.
+
+usage: python benchmarks/bench_package_parser.py [--pkgbuilds 20] [--functions 20] [--lines 40] [--repeat 5]
+"""
+
+import os
+import sys
+import shutil
+import atexit
+import argparse
+import tempfile
+from pathlib import Path
+
+SRC_FOLDER = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_FOLDER))
+
+# archdots resolves CACHE_FOLDER from HOME when imported, so the parser cache lives in a throwaway home
+BENCH_HOME = tempfile.mkdtemp(prefix="archdots-bench-")
+atexit.register(shutil.rmtree, BENCH_HOME, ignore_errors=True)
+os.environ["HOME"] = os.environ["USERPROFILE"] = BENCH_HOME
+
+from lark import Lark
+
+from _common import report, time_calls
+from archdots import package_parser
+from archdots.package_parser import (
+    GRAMMAR,
+    PARSER_CACHE,
+    PackageTransformer,
+    find_function,
+)
+
+FUNCTION = """
+{name}() {{
+    # step {name}
+    $target = "$env:LOCALAPPDATA\\\\{name}"
+    if (Test-Path $target) {{
+        Remove-Item -Recurse -Force $target
+    }} else {{
+        New-Item -ItemType Directory $target | Out-Null
+    }}
+{body}
+}}
+"""
+
+BODY_LINE = '    foreach ($i in $sourced.Values) {{ Write-Host "line {i}: $i" }}'
+
+
+def generate_pkgbuild(functions: int, lines: int) -> str:
+    header = """
+description='synthetic package'
+url='https://example.com'
+depends=('winget:Git.Git' 'scoop:7zip')
+source=('https://example.com/a.zip' 'https://example.com/b.zip')
+platform='windows'
+"""
+    body = "\n".join(BODY_LINE.format(i=i) for i in range(max(0, lines - 8)))
+    names = ["check", "install", "uninstall", *(f"step{i}" for i in range(functions))]
+    return header + "".join(
+        FUNCTION.format(name=name, body=body) for name in names[:functions]
+    )
+
+
+def clear_memo():
+    package_parser._parsed_pkgbuilds.clear()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argparser.add_argument("--pkgbuilds", type=int, default=20)
+    argparser.add_argument("--functions", type=int, default=20)
+    argparser.add_argument("--lines", type=int, default=40)
+    argparser.add_argument("--repeat", type=int, default=5)
+    options = argparser.parse_args()
+
+    folder = Path(BENCH_HOME) / "pkgbuilds"
+    paths = []
+    for i in range(options.pkgbuilds):
+        (folder / f"pkg{i}").mkdir(parents=True)
+        paths.append(folder / f"pkg{i}" / "PKGBUILD")
+        paths[-1].write_text(generate_pkgbuild(options.functions, options.lines))
+    texts = [path.read_text() for path in paths]
+
+    earley = Lark(GRAMMAR)
+    lalr = package_parser.get_parser()
+
+    for text in texts:
+        assert PackageTransformer().transform(
+            earley.parse(text)
+        ) == PackageTransformer().transform(lalr.parse(text))
+
+    function_names = [
+        item.name
+        for item in PackageTransformer().transform(lalr.parse(texts[0]))
+        if isinstance(item, package_parser.Function)
+    ]
+
+    def reparse_each_function():
+        for text in texts:
+            for name in function_names:
+                next(
+                    item
+                    for item in PackageTransformer().transform(lalr.parse(text))
+                    if isinstance(item, package_parser.Function) and item.name == name
+                )
+
+    def memoized_functions():
+        for path in paths:
+            for name in function_names:
+                find_function(path, name)
+
+    benchmarks = {
+        ("construct", "earley"): (lambda: Lark(GRAMMAR), None),
+        ("construct", "lalr"): (
+            lambda: Lark(GRAMMAR, parser="lalr", lexer="contextual"),
+            None,
+        ),
+        ("construct", "lalr_cached"): (
+            lambda: Lark(
+                GRAMMAR, parser="lalr", lexer="contextual", cache=str(PARSER_CACHE)
+            ),
+            None,
+        ),
+        ("parse", "earley"): (lambda: [earley.parse(text) for text in texts], None),
+        ("parse", "lalr"): (lambda: [lalr.parse(text) for text in texts], None),
+        ("run_functions", "reparse"): (reparse_each_function, None),
+        ("run_functions", "memoized"): (memoized_functions, clear_memo),
+    }
+    for (benchmark, variant), (function, setup) in benchmarks.items():
+        report(
+            time_calls(function, options.repeat, setup),
+            benchmark=benchmark,
+            variant=variant,
+            pkgbuilds=options.pkgbuilds,
+            lines=len(texts[0].splitlines()),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+compare `reconcile_list` with the frozenset reconciliation iterdict_imports used before it.
+
+random lists are reconciled with both, checking that
+ - both keep and leave the same items (as sets)
+ - items kept from the file are in their original order, followed by the new items in the order they were added
+then both are timed on a pkgs list of --size entries.
+
+usage: python benchmarks/bench_reconcile_list.py [--size 2000] [--cases 2000] [--repeat 20]
+"""
+
+import sys
+import random
+import argparse
+from pathlib import Path
+
+SRC_FOLDER = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_FOLDER))
+
+from _common import report, time_calls
+from archdots.settings import freeze, unfreeze, reconcile_list
+
+
+def frozenset_reconcile(current: list, merged: list, new_merged: list):
+    new_merged_items = freeze(new_merged)
+    keeped_items = frozenset(freeze(current)).intersection(new_merged_items)
+    new_items = new_merged_items.difference(freeze(merged))
+    return (
+        [*unfreeze(keeped_items), *unfreeze(new_items)],
+        unfreeze(new_merged_items - keeped_items - new_items),
+    )
+
+
+def random_case(rng: random.Random, size: int):
+    universe = [f"pkg{i}" for i in range(size * 2)]
+    current = rng.sample(universe, rng.randint(0, size))
+    merged = current + rng.sample(universe, rng.randint(0, size))
+    new_merged = [item for item in merged if rng.random() > 0.2]
+    new_merged += rng.sample(universe, rng.randint(0, size // 4))
+    rng.shuffle(new_merged)
+    return current, merged, list(dict.fromkeys(new_merged))
+
+
+def check(cases: int):
+    rng = random.Random(0)
+    for _ in range(cases):
+        current, merged, new_merged = random_case(rng, rng.randint(0, 30))
+        result, left = reconcile_list(current, merged, new_merged)
+        expected_result, expected_left = frozenset_reconcile(
+            current, merged, new_merged
+        )
+
+        assert set(result) == set(expected_result), (current, merged, new_merged)
+        assert set(left) == set(expected_left), (current, merged, new_merged)
+
+        kept = [item for item in current if item in new_merged]
+        added = [item for item in new_merged if item not in merged]
+        assert result == kept + added, (current, merged, new_merged)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argparser.add_argument("--size", type=int, default=2000)
+    argparser.add_argument("--cases", type=int, default=2000)
+    argparser.add_argument("--repeat", type=int, default=20)
+    options = argparser.parse_args()
+
+    check(options.cases)
+
+    current = [f"pkg{i}" for i in range(options.size)]
+    merged = current + [f"other{i}" for i in range(options.size)]
+    new_merged = [item for i, item in enumerate(merged) if i % 10] + ["new"]
+
+    for name, function in (
+        ("frozenset", frozenset_reconcile),
+        ("reconcile_list", reconcile_list),
+    ):
+        report(
+            time_calls(lambda: function(current, merged, new_merged), options.repeat),
+            routine=name,
+            size=options.size,
+        )
+
+
+if __name__ == "__main__":
+    main()
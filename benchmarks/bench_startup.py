@@ -0,0 +1,226 @@
+"""
+measure the dispatch cost of dots over synthetic command trees.
+
+for each tree size (half .py, half .sh commands with ARCHDOTS metadata) it times
+ - command_tree: cold walks the roots (build_command_tree), warm reads the command index
+ - extract_metadata: cold parses every metadata block, warm reads the metadata cache
+ - build_argparser: cold without any metadata cache, warm with a filled one
+ - dots_help: `dots --help` in a new interpreter, cold without CACHE_FOLDER, warm after a previous run
+
+results are printed as one json object per line, with times in milliseconds.
+
+usage: python benchmarks/bench_startup.py [--sizes 10 100 1000] [--repeat 10]
+"""
+
+import os
+import sys
+import shutil
+import atexit
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+SRC_FOLDER = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_FOLDER))
+
+# archdots resolves its folders from HOME when imported, so every cache lives in a throwaway home
+BENCH_HOME = tempfile.mkdtemp(prefix="archdots-bench-")
+atexit.register(shutil.rmtree, BENCH_HOME, ignore_errors=True)
+os.environ["HOME"] = os.environ["USERPROFILE"] = BENCH_HOME
+
+from _common import report, time_calls
+from archdots.constants import CACHE_FOLDER, COMMANDS_FOLDER, CONFIG_FOLDER, MODULE_PATH
+from archdots.argparsing import (
+    build_argparser,
+    build_command_tree,
+    extract_metadata,
+    MetadataCache,
+)
+from archdots.command_index import (
+    EXCLUDED_FOLDERS,
+    load_command_index,
+    save_command_index,
+    command_tree_from_index,
+)
+
+# commands per folder, deeper trees nest folders inside folders
+FOLDER_SIZE = 10
+# extensions of the commands of this repo and of the generated ones
+COMMAND_EXTENSIONS = (".py", ".sh")
+
+PY_COMMAND = '''"""
+ARCHDOTS
+help: synthetic python command {i}
+arguments:
+  - name: target
+    required: false
+    type: str
+    nargs: "*"
+    help: packages to act on. Leave empty for all
+flags:
+  - long: --filter
+    type: str
+    nargs: "+"
+    choices: ['pacman', 'yay', 'flatpak']
+    help: filter by package manager
+  - long: --raw
+    short: -r
+    type: bool
+    help: do not pretty print
+ARCHDOTS
+"""
+
+# this prevents the language server to throwing warnings
+args = args  # type: ignore
+
+print(args)
+'''
+
+SH_COMMAND = """#/bin/env bash
+
+: <<ARCHDOTS
+help: synthetic shell command {i}
+arguments:
+  - name: type
+    required: false
+    type: str
+    choices: ['pkgs', 'dots']
+    help: specify type of synching. Leave empty for both
+flags:
+  - long: --level
+    type: int
+    help: sets tree view max depth level
+  - long: --fast
+    type: bool
+    help: skip slow checks
+ARCHDOTS
+
+echo "${{args[type]}}"
+"""
+
+
+def generate_commands(root: Path, size: int):
+    """
+    create `size` commands below `root`, FOLDER_SIZE per folder
+    """
+    shutil.rmtree(root, ignore_errors=True)
+    for i in range(size):
+        group = i // FOLDER_SIZE
+        # every FOLDER_SIZE groups share a parent folder
+        folder = root / f"bench{group // FOLDER_SIZE}" / f"group{group}"
+        folder.mkdir(parents=True, exist_ok=True)
+        if i % 2:
+            (folder / f"cmd{i}.sh").write_text(SH_COMMAND.format(i=i))
+        else:
+            (folder / f"cmd{i}.py").write_text(PY_COMMAND.format(i=i))
+
+
+def clear_caches():
+    shutil.rmtree(CACHE_FOLDER, ignore_errors=True)
+
+
+def command_files(roots: list[str]) -> list[Path]:
+    """
+    command files below `roots`, skipping the folders the command tree skips
+    """
+    files = []
+    for root in roots:
+        for folder, dirs, filenames in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_FOLDERS]
+            files.extend(
+                Path(folder) / f for f in filenames if f.endswith(COMMAND_EXTENSIONS)
+            )
+    return files
+
+
+def bench_command_tree(roots: list[str], repeat: int):
+    cold = time_calls(lambda: build_command_tree(roots, "archdots"), repeat)
+
+    def from_index():
+        index, _ = load_command_index(roots)
+        command_tree_from_index(roots, index, "archdots")
+
+    save_command_index(roots, load_command_index(roots)[0])
+    warm = time_calls(from_index, repeat)
+    return cold, warm
+
+
+def bench_extract_metadata(roots: list[str], repeat: int):
+    files = command_files(roots)
+
+    def extract_all():
+        for file in files:
+            extract_metadata(file)
+
+    def from_cache():
+        cache = MetadataCache()
+        for file in files:
+            cache.get(file)
+
+    cold = time_calls(extract_all, repeat)
+
+    cache = MetadataCache()
+    for file in files:
+        cache.get(file)
+    cache.save()
+    warm = time_calls(from_cache, repeat)
+    return cold, warm
+
+
+def bench_build_argparser(roots: list[str], repeat: int):
+    tree = build_command_tree(roots, "archdots")
+    cold = time_calls(lambda: build_argparser(tree), repeat)
+
+    cache = MetadataCache()
+    build_argparser(tree, cache)
+    cache.save()
+    warm = time_calls(lambda: build_argparser(tree, MetadataCache()), repeat)
+    return cold, warm
+
+
+def bench_dots_help(repeat: int):
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(SRC_FOLDER), os.environ.get("PYTHONPATH")])
+        ),
+    }
+    command = [sys.executable, "-c", "import archdots; archdots.main()", "--help"]
+
+    def run():
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+
+    cold = time_calls(run, repeat, setup=clear_caches)
+    run()
+    warm = time_calls(run, repeat)
+    return cold, warm
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argparser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    argparser.add_argument("--repeat", type=int, default=10)
+    options = argparser.parse_args()
+
+    roots = [
+        str(Path(p) / Path(COMMANDS_FOLDER).name) for p in (MODULE_PATH, CONFIG_FOLDER)
+    ]
+
+    for size in options.sizes:
+        generate_commands(Path(COMMANDS_FOLDER), size)
+
+        benchmarks = {
+            "command_tree": lambda: bench_command_tree(roots, options.repeat),
+            "extract_metadata": lambda: bench_extract_metadata(roots, options.repeat),
+            "build_argparser": lambda: bench_build_argparser(roots, options.repeat),
+            "dots_help": lambda: bench_dots_help(options.repeat),
+        }
+        for name, bench in benchmarks.items():
+            clear_caches()
+            for state, timings in zip(("cold", "warm"), bench()):
+                report(timings, benchmark=name, state=state, commands=size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+time reading PKGBUILDs with the static extractor against sourcing them with bash.
+
+--pkgbuilds PKGBUILDs are rendered from the templates written by `dots pkg new` and `dots health new`
+(archdots.pkgbuild_templates). that both parsers read them the same way is checked by tests/test_static_pkgbuild.py.
+
+results are printed as one json object per line, with times in milliseconds.
+
+usage: python benchmarks/bench_static_pkgbuild.py [--pkgbuilds 50] [--repeat 10]
+"""
+
+import sys
+import shutil
+import atexit
+import argparse
+import tempfile
+from pathlib import Path
+
+SRC_FOLDER = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_FOLDER))
+
+from _common import report, time_calls
+from archdots.package import parse_package_static, parse_packages_bash
+from archdots.pkgbuild_templates import health_pkgbuild, package_pkgbuild
+
+
+def render(i: int) -> str:
+    if i % 2:
+        return health_pkgbuild(
+            f"health{i}", f"health script {i}", [f"custom:pkg{i - 1}"], "linux"
+        )
+    return package_pkgbuild(
+        f"pkg{i}",
+        f"package {i}",
+        "https://example.com",
+        ["pacman:git", "yay:visual-studio-code-bin"],
+        [f"https://example.com/{i}.tar.gz"],
+        "linux",
+    )
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argparser.add_argument("--pkgbuilds", type=int, default=50)
+    argparser.add_argument("--repeat", type=int, default=10)
+    options = argparser.parse_args()
+
+    folder = Path(tempfile.mkdtemp(prefix="archdots-pkgbuilds-"))
+    atexit.register(shutil.rmtree, folder, ignore_errors=True)
+    paths = []
+    for i in range(options.pkgbuilds):
+        (folder / str(i)).mkdir()
+        paths.append(folder / str(i) / "PKGBUILD")
+        paths[-1].write_text(render(i))
+
+    for parser, function in (
+        ("bash", lambda: parse_packages_bash(paths)),
+        ("static", lambda: [parse_package_static(path) for path in paths]),
+    ):
+        report(
+            time_calls(function, options.repeat),
+            parser=parser,
+            pkgbuilds=len(paths),
+        )
+
+
+if __name__ == "__main__":
+    main()
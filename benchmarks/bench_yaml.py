@@ -0,0 +1,74 @@
+"""
+compare the pure python yaml loader and dumper with the ones of archdots.yaml_io.
+
+a config of about --lines lines (pkgs lists and a few nested settings) is generated, then
+ - both loaders must return the same config and both dumpers must emit the same text
+ - loading and dumping it is timed with each of them
+
+results are printed as one json object per line, with times in milliseconds.
+
+usage: python benchmarks/bench_yaml.py [--lines 5000] [--repeat 10]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+SRC_FOLDER = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_FOLDER))
+
+import yaml
+from _common import report, time_calls
+from archdots import yaml_io
+
+PACKAGE_MANAGERS = ["pacman", "yay", "flatpak", "custom"]
+
+
+def generate_config(lines: int) -> dict:
+    packages_per_pm = max(1, (lines - 40) // len(PACKAGE_MANAGERS))
+    return {
+        "chezmoi": ["~/.config/archdots", "~/.local/share/chezmoi"],
+        "import": ["./hosts/desktop.yaml", "./conf.d/*.yaml"],
+        "settings": {
+            "editor": "nvim",
+            "theme": {"name": "catppuccin", "variant": "mocha", "transparency": 0.9},
+            "description": "per host settings, " * 8,
+            "hooks": [{"name": f"hook{i}", "enabled": i % 2 == 0} for i in range(5)],
+        },
+        "pkgs": {
+            pm: [f"{pm}-package-{i}" for i in range(packages_per_pm)]
+            for pm in PACKAGE_MANAGERS
+        },
+    }
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argparser.add_argument("--lines", type=int, default=5000)
+    argparser.add_argument("--repeat", type=int, default=10)
+    options = argparser.parse_args()
+
+    config = generate_config(options.lines)
+    text = yaml.dump(config)
+
+    assert yaml.safe_load(text) == yaml_io.load(text) == config
+    assert yaml_io.dump(config) == text
+
+    benchmarks = {
+        ("load", "pure"): lambda: yaml.safe_load(text),
+        ("load", "yaml_io"): lambda: yaml_io.load(text),
+        ("dump", "pure"): lambda: yaml.dump(config),
+        ("dump", "yaml_io"): lambda: yaml_io.dump(config),
+    }
+    for (operation, implementation), function in benchmarks.items():
+        report(
+            time_calls(function, options.repeat),
+            operation=operation,
+            implementation=implementation,
+            libyaml=yaml.__with_libyaml__,
+            lines=len(text.splitlines()),
+        )
+
+
+if __name__ == "__main__":
+    main()
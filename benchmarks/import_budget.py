@@ -0,0 +1,88 @@
+"""
+fail when `dots --info` imports more than the budget allows.
+
+the check runs `dots --info` with warm caches under `python -X importtime` and fails when
+ - the summed self import time exceeds --budget-ms, or
+ - one of the heavy dependencies that only commands need gets imported
+
+usage: python benchmarks/import_budget.py [--budget-ms 120] [--repeat 5]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+SRC_FOLDER = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_FOLDER))
+
+from archdots.imports import parse_import_times
+
+# dependencies that must stay out of the dispatch path
+FORBIDDEN_PACKAGES = ["yaml", "dacite", "deepmerge", "lark", "inquirer"]
+
+DEFAULT_BUDGET_MS = 120
+
+
+def import_times(code: str, args: list[str], env: dict[str, str]) -> dict[str, int]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    if process.returncode != 0:
+        raise SystemExit(process.stderr)
+    return parse_import_times(process.stderr.splitlines())
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argparser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    argparser.add_argument("--repeat", type=int, default=5)
+    options = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = {
+            **os.environ,
+            "HOME": home,
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(SRC_FOLDER), os.environ.get("PYTHONPATH")])
+            ),
+        }
+        code = "import archdots; archdots.main()"
+
+        # first run fills the caches
+        import_times(code, ["--info"], env)
+        startup = import_times("pass", [], env)
+
+        totals = []
+        imported: set[str] = set()
+        for _ in range(options.repeat):
+            times = {
+                module: import_time
+                for module, import_time in import_times(code, ["--info"], env).items()
+                if module not in startup
+            }
+            imported.update(times)
+            totals.append(sum(times.values()) / 1000)
+
+    total_ms = statistics.median(totals)
+    forbidden = sorted(
+        module for module in imported if module.split(".")[0] in FORBIDDEN_PACKAGES
+    )
+
+    print(f"dots --info import time: {total_ms:.2f} ms (budget {options.budget_ms} ms)")
+    if forbidden:
+        print(f"forbidden imports: {', '.join(forbidden)}")
+
+    if forbidden or total_ms > options.budget_ms:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
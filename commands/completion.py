@@ -0,0 +1,21 @@
+"""
+ARCHDOTS
+help: print the shell completion script. e.g. `dots completion bash > ~/.local/share/bash-completion/completions/dots`
+arguments:
+  - name: shell
+    required: true
+    type: str
+    choices: ['bash', 'zsh', 'fish']
+    help: target shell
+ARCHDOTS
+"""
+
+# this prevents the language server to throwing warnings
+args = args  # type: ignore
+
+from archdots.completion import COMPLETION_SCRIPTS
+
+scripts = {"bash": "dots.bash", "zsh": "_dots", "fish": "dots.fish"}
+
+with open(COMPLETION_SCRIPTS / scripts[args["shell"]], "r") as f:
+    print(f.read(), end="")
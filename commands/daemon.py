@@ -0,0 +1,20 @@
+"""
+ARCHDOTS
+help: keep settings and packages in memory to answer read-only commands (status, pkg list, settings dump) faster
+flags:
+    - long: --stop
+      type: bool
+      help: stop the running daemon
+ARCHDOTS
+"""
+
+# this prevents the language server to throwing warnings
+args = args  # type: ignore
+
+from archdots.daemon import serve, stop_daemon
+
+if args["stop"]:
+    stop_daemon()
+    exit()
+
+serve()
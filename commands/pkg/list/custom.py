@@ -9,14 +9,11 @@ args = args  # type: ignore
 
 from rich import print
 from archdots.package_manager import Custom
-from archdots.settings import read_config
+from archdots.settings import read_config_view
 
 packages = Custom().get_packages(ignore_platform=True)
 
-config = read_config()
-custom_config = []
-if "pkgs" in config and "custom" in config["pkgs"]:
-    custom_config = config["pkgs"]["custom"]
+custom_config = read_config_view().packages_of("custom")
 
 
 def print_aligned(key, value):
@@ -15,11 +15,11 @@ args = args  # type: ignore
 from rich import print
 from archdots.console import print_title
 from archdots.package_manager import package_managers
-from archdots.settings import read_config
+from archdots.settings import read_config_view
 
-config = read_config()
+config_view = read_config_view()
 
-if "pkgs" not in config:
+if not config_view.has_pkgs:
     import sys
 
     print("there is no pkgs configured", file=sys.stderr)
@@ -32,11 +32,11 @@ for name, pkgs in packages.items():
         continue
     if args["filter"] and name not in args["filter"]:
         continue
-    if name not in config["pkgs"]:
+    if name not in config_view.packages:
         continue
 
     print_title(f"{name}")
     for pkg_name in pkgs:
-        if pkg_name not in config["pkgs"][name]:
+        if pkg_name not in config_view.packages[name]:
             continue
         print(pkg_name)
@@ -16,32 +16,31 @@ import sys
 from rich import print
 from archdots.console import print_title
 from archdots.package_manager import package_managers, Custom
-from archdots.settings import read_config
+from archdots.settings import read_config_view
 
 installed_pkgs_by_pm = {pm.name: pm.get_installed() for pm in package_managers}
 
-custom_pkg_names = [pkg.name for pkg in Custom().get_packages(use_memo=True)]
+custom_pkg_names = {pkg.name for pkg in Custom().get_packages(use_memo=True)}
 
-config = read_config()
+config_view = read_config_view()
 
-if "pkgs" not in config:
+if not config_view.has_pkgs:
     print("there is no pkgs configured", file=sys.stderr)
     exit()
 
 pending_packages: dict[str, list[str]] = {}
 all_obscured_packages: list[str] = []
 for pm_name in installed_pkgs_by_pm:
-    if pm_name not in config["pkgs"]:
+    if pm_name not in config_view.packages:
         continue
-    obscured_packages = set()
+    configured_packages = config_view.packages[pm_name]
+    obscured_packages = frozenset()
     if pm_name != Custom().name:
-        obscured_packages = set(custom_pkg_names).intersection(config["pkgs"][pm_name])
+        obscured_packages = custom_pkg_names & configured_packages
         all_obscured_packages.extend(f"{pm_name}:{pkg}" for pkg in obscured_packages)
 
     pending_packages[pm_name] = list(
-        set(config["pkgs"][pm_name])
-        - set(installed_pkgs_by_pm[pm_name])
-        - obscured_packages
+        configured_packages - set(installed_pkgs_by_pm[pm_name]) - obscured_packages
     )
 
 for name, pkgs in pending_packages.items():
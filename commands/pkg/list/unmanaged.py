@@ -15,22 +15,16 @@ args = args  # type: ignore
 from rich import print
 from archdots.console import print_title
 from archdots.package_manager import package_managers
-from archdots.settings import read_config
+from archdots.settings import read_config_view
 
 installed_pkgs_by_pm = {pm.name: pm.get_installed() for pm in package_managers}
 
-config = read_config()
-
-
-if "pkgs" not in config:
-    config["pkgs"] = {}
+config_view = read_config_view()
 
 unmanaged_packages: dict[str, list[str]] = {}
 for pm_name in installed_pkgs_by_pm.keys():
-    if pm_name not in config["pkgs"]:
-        config["pkgs"][pm_name] = []
     unmanaged_packages[pm_name] = list(
-        set(installed_pkgs_by_pm[pm_name]) - set(config["pkgs"][pm_name])
+        set(installed_pkgs_by_pm[pm_name]) - config_view.packages_of(pm_name)
     )
 
 for name, pkgs in unmanaged_packages.items():
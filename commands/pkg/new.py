@@ -11,6 +11,7 @@ from archdots.console import print_title
 from archdots.package import Package
 from archdots.package_manager import package_managers, are_custom_packages_valid, Custom
 from archdots.utils import default_editor
+from archdots.pkgbuild_templates import package_pkgbuild
 from rich import print
 from rich.prompt import Prompt, Confirm
 from archdots.constants import PACKAGES_FOLDER, PLATFORM
@@ -88,41 +89,13 @@ new_pkg = Package(
 
 are_custom_packages_valid([*all_packages, new_pkg])
 
-new_pkgbuild = f'''
-description='{pkg_description.replace("'", "\\'")}'
-url='{pkg_url.replace("'", "\\'")}'
-depends=({' '.join(f"'{dep}'" for dep in pkg_dependencies)})
-source=({' '.join(f"'{source}'" for source in pkg_sources)})
-# source_on_check=false
-# make this package platform specific. Supported platforms: linux, windows 
-platform='{PLATFORM}'
-
-# All items of source will be downloaded and extracted (when necessary)
-# all downloaded (or extracted folders) are stored inside ${{sourced[@]}}
-# This script runs inside a folder over ~/.cache/archdots/pkgname, where all sources are downloaded
-#
-# $PKGPATH has the path to folder containing this file 
-
-# This function install the package on the system
-install() {{
-    echo "message from install() of {pkg_name}" 
-}}
-
-# This function uninstall the package from the system
-uninstall() {{
-    echo "message from uninstall() of {pkg_name}" 
-}}
-
-# This function should end with exit code 0 when the package is installed on system
-# and end with exit code 1 when it is uninstalled
-check() {{
-    echo "message from check() of {pkg_name}" 
-}}
-'''
+new_pkgbuild = package_pkgbuild(
+    pkg_name, pkg_description, pkg_url, pkg_dependencies, pkg_sources, PLATFORM
+)
 
 os.makedirs(Path(PACKAGES_FOLDER) / pkg_name, exist_ok=True)
 with open(Path(PACKAGES_FOLDER) / pkg_name / "PKGBUILD", "w") as f:
-    f.write(new_pkgbuild.strip())
+    f.write(new_pkgbuild)
 
 if Confirm.ask(f"Add {pkg_name} as a managed package?", default=True):  # type: ignore
     from archdots.settings import read_config, save_config
@@ -15,7 +15,7 @@ from math import ceil
 
 from archdots.constants import PLATFORM
 from archdots.package_manager import Custom, PackageManager, package_managers
-from archdots.settings import read_config, save_config
+from archdots.settings import read_config_view, save_config
 from archdots.console import print_title, title, warn_console
 
 from rich.live import Live
@@ -123,18 +123,21 @@ class Row(NamedTuple):
 packages_by_pm = {pm.name: pm.get_installed() for pm in package_managers}
 pm_by_name: dict[str, PackageManager] = {pm.name: pm for pm in package_managers}
 
-config = read_config()
+config_view = read_config_view()
+config = config_view.config
 
 unmanaged_packages: dict[str, list[str]] = {}
 
-if "pkgs" not in config:
+if not config_view.has_pkgs:
     unmanaged_packages = packages_by_pm
 else:
     for pm in packages_by_pm:
-        if pm not in config["pkgs"]:
+        if pm not in config_view.packages:
             unmanaged_packages[pm] = packages_by_pm[pm]
             continue
-        unmanaged_packages[pm] = list(set(packages_by_pm[pm]) - set(config["pkgs"][pm]))
+        unmanaged_packages[pm] = list(
+            set(packages_by_pm[pm]) - config_view.packages[pm]
+        )
 
 if not unmanaged_packages:
     print("there are any unmanaged packages")
@@ -149,8 +152,7 @@ rows.sort(key=lambda r: r.pkg)
 lost_packages = set(pkg.name for pkg in Custom().get_packages(True)).difference(
     Custom().get_installed(True)
 )
-if "pkgs" in config and "custom" in config["pkgs"]:
-    lost_packages = lost_packages.difference(config["pkgs"]["custom"])
+lost_packages = lost_packages.difference(config_view.packages_of("custom"))
 
 if not rows:
     if lost_packages:
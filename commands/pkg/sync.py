@@ -25,7 +25,7 @@ from archdots.package_manager import (
     Custom,
     split_packages_by_pm,
 )
-from archdots.settings import read_config
+from archdots.settings import read_config_view
 from archdots.console import title, warn_console, print_title
 from rich.prompt import Confirm
 import importlib.util
@@ -44,9 +44,9 @@ if args["uninstall"]:
 if args["install"] or args["uninstall"]:
     exit()
 
-config = read_config()
+config_view = read_config_view()
 
-if "pkgs" not in config:
+if not config_view.has_pkgs:
     print("there is no pkgs configured", file=sys.stderr)
     exit()
 
@@ -55,21 +55,22 @@ packages_by_pm: dict[str, list[str]] = {
 }
 pm_by_name: dict[str, PackageManager] = {pm.name: pm for pm in package_managers}
 
-custom_pkg_names = [pkg.name for pkg in Custom().get_packages(use_memo=True)]
+custom_pkg_names = {pkg.name for pkg in Custom().get_packages(use_memo=True)}
 
 pending_packages: dict[str, list[str]] = {}
 flatten_pending_packages: list[str] = []
 all_obscured_packages: list[str] = []
 for pm in packages_by_pm:
-    if pm not in config["pkgs"]:
+    if pm not in config_view.packages:
         continue
-    obscured_packages = set()
+    configured_packages = config_view.packages[pm]
+    obscured_packages = frozenset()
     if pm != Custom().name:
-        obscured_packages = set(custom_pkg_names).intersection(config["pkgs"][pm])
+        obscured_packages = custom_pkg_names & configured_packages
         all_obscured_packages.extend(f"{pm}:{pkg}" for pkg in obscured_packages)
 
     pending_packages[pm] = list(
-        set(config["pkgs"][pm]) - set(packages_by_pm[pm]) - obscured_packages
+        configured_packages - set(packages_by_pm[pm]) - obscured_packages
     )
     flatten_pending_packages.extend(f"{pm}:{pkg}" for pkg in pending_packages[pm])
 
@@ -90,10 +91,10 @@ if any(pkgs for pkgs in pending_packages.values()):
             pm_by_name[pm_name].install(packages)
 
 unmanaged_packages: list[str] = []
-for pm in config["pkgs"]:
+for pm, configured_packages in config_view.packages.items():
     if pm not in packages_by_pm:
         continue
-    unmanaged_packages.extend(set(packages_by_pm[pm]) - set(config["pkgs"][pm]))
+    unmanaged_packages.extend(set(packages_by_pm[pm]) - configured_packages)
 
 if unmanaged_packages and Confirm.ask(
     title("there are unmanaged packages. Review?"), default=True  # type: ignore
@@ -109,8 +110,7 @@ else:
     lost_packages = set(pkg.name for pkg in Custom().get_packages(True)).difference(
         Custom().get_installed(True)
     )
-    if "custom" in config["pkgs"]:
-        lost_packages = lost_packages.difference(config["pkgs"]["custom"])
+    lost_packages = lost_packages.difference(config_view.packages_of("custom"))
 
     if lost_packages:
         warn_console.print(
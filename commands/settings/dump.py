@@ -2,9 +2,9 @@ from rich.syntax import Syntax
 from rich.console import Console
 
 from archdots.settings import read_config
-import yaml
+from archdots import yaml_io
 
 console = Console()
-syntax = Syntax(yaml.dump(read_config()), "yaml", background_color="default")
+syntax = Syntax(yaml_io.dump(read_config()), "yaml", background_color="default")
 
 console.print(syntax)
@@ -16,21 +16,16 @@ ARCHDOTS
 # this prevents the language server to throwing warnings
 args = args  # type: ignore
 
-from archdots.settings import read_config
-import yaml
-import os
-
-yaml_config = yaml.dump(read_config())
+import json
 
-extra_args = ""
-if args["raw"]:
-    extra_args = "--raw-output"
-    pass
+from archdots.query import run_query
+from archdots.settings import read_config
 
-os.system(
-    f"""(
-cat <<EOF
-{yaml_config}
-EOF
-) |yq '{args['input']}' {extra_args}"""
-)
+# evaluated in-process, see archdots.query for the supported subset of jq
+for result in run_query(args["input"], read_config()):
+    if args["raw"] and isinstance(result, str):
+        print(result)
+    elif args["raw"]:
+        print(json.dumps(result, ensure_ascii=False, default=str))
+    else:
+        print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
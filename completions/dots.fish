@@ -0,0 +1,34 @@
+# fish completion for dots
+# reads the index written by dots to ~/.cache/archdots/completion.tsv, so python is never started
+
+function __dots_complete
+    set -l index ~/.cache/archdots/completion.tsv
+    test -r $index; or return
+    set -l tokens (commandline -opc)
+    awk -F '\t' '
+    BEGIN {
+      n = ARGC - 2
+      for (i = 2; i < ARGC; i++) { words[i - 1] = ARGV[i]; delete ARGV[i] }
+      current = words[n]; n--
+    }
+    { subcommands[$1] = $2; options[$1] = $3; choices[$1] = $4 }
+    END {
+      path = ""
+      for (i = 1; i <= n; i++) {
+        if (words[i] ~ /^-/) continue
+        key = path == "" ? words[i] : path " " words[i]
+        if (key in subcommands) path = key
+      }
+      flag = path == "" ? words[n] : path " " words[n]
+      if (n > 0 && words[n] ~ /^-/ && flag in choices) out = choices[flag]
+      else if (current ~ /^-/) out = options[path]
+      else out = subcommands[path] " " choices[path]
+
+      count = split(out, candidates, " ")
+      for (i = 1; i <= count; i++)
+        if (index(candidates[i], current) == 1) print candidates[i]
+    }
+' $index $tokens[2..-1] (commandline -ct)
+end
+
+complete -c dots -f -a '(__dots_complete)'
@@ -1,17 +1,8 @@
 from pathlib import Path
-import json
 import os
-from dacite.core import from_dict
-
-from archdots.schema import Metadata, ExtendedJSONEncoder
-from archdots.exceptions import (
-    CommandException,
-    GuiException,
-    PackageManagerException,
-    PackageException,
-    ParseException,
-    SettingsException,
-)
+import sys
+
+from archdots.exceptions import ARCHDOTS_EXCEPTIONS
 from archdots.constants import (
     CHEZMOI_FOLDER,
     CONFIG_FOLDER,
@@ -22,73 +13,80 @@ from archdots.constants import (
 )
 from archdots.argparsing import (
     run_command,
-    build_command_tree,
-    build_argparser,
+    build_lazy_argparser,
+    MetadataCache,
+)
+from archdots.command_index import (
+    load_command_index,
+    save_command_index,
+    command_tree_from_index,
 )
+from archdots.completion import update_completion_index
+from archdots.daemon import forward_to_daemon
+
+
+def dispatch(argv: list[str]) -> int:
+    """
+    parse `argv` and run the selected command. returns its exit status
+    """
+    roots = [
+        str(Path(p) / Path(COMMANDS_FOLDER).name) for p in (MODULE_PATH, CONFIG_FOLDER)
+    ]
+    command_index, index_changed = load_command_index(roots)
+    command_tree = command_tree_from_index(roots, command_index, "archdots")
+
+    metadata_cache = MetadataCache()
+    parser, metadata_dict, parser_dict = build_lazy_argparser(
+        command_tree, argv, metadata_cache
+    )
+
+    # the shell completion reads this index instead of running dots
+    update_completion_index(command_tree, metadata_cache.get)
+
+    if index_changed:
+        save_command_index(roots, command_index)
+    metadata_cache.save()
+
+    parser.add_argument('--info', action='store_true', help="useful informations")
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="print the import time of each package used by the command",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.info == True:
+        from rich import print
+        print('archdots\n')
+        print('{: <20}: {}'.format('config folder', CONFIG_FOLDER))
+        print('{: <20}: {}'.format('cache folder', CACHE_FOLDER))
+        print('{: <20}: {}'.format('chezmoi folder', CHEZMOI_FOLDER))
+        print('{: <20}: {}'.format('recognized platform', PLATFORM))
+        return 0
+
+    return run_command(args, metadata_dict, parser_dict)
 
 
 def main():
     """
     archdots entrypoint
     """
+    argv = sys.argv[1:]
+
+    if "--profile-imports" in argv:
+        from archdots.imports import profile_imports
+
+        exit(profile_imports([arg for arg in argv if arg != "--profile-imports"]))
+
+    # read-only commands are answered by `dots daemon` when it is running
+    if (status := forward_to_daemon(argv)) is not None:
+        exit(status)
+
+    status = 0
     try:
-        roots = [
-            str(Path(p) / Path(COMMANDS_FOLDER).name)
-            for p in (MODULE_PATH, CONFIG_FOLDER)
-        ]
-        command_tree = build_command_tree(roots, "archdots")
-        command_tree_json = json.dumps(command_tree, cls=ExtendedJSONEncoder)
-
-        cached_command_tree_path = Path(CACHE_FOLDER) / "command_tree.json"
-        cached_metadata_dict_path = Path(CACHE_FOLDER) / "metadata_dict.json"
-
-        cached_metadata_dict = None
-        if cached_command_tree_path.is_file() and cached_metadata_dict_path.is_file():
-            with open(cached_command_tree_path, "r") as f:
-                cached_command_tree = f.read()
-
-            try:
-                if command_tree_json == cached_command_tree:
-                    with open(cached_metadata_dict_path, "r") as f:
-                        cached_metadata_dict = json.load(f)
-                    for k, v in cached_metadata_dict.items():
-
-                        cached_metadata_dict[k] = from_dict(Metadata, v)
-            except:
-                cached_metadata_dict = None
-
-        parser, metadata_dict, parser_dict = build_argparser(
-            command_tree, cached_metadata_dict
-        )
-        parser.add_argument('--info', action='store_true', help="useful informations")
-
-        args = parser.parse_args()
-
-        if args.info == True:
-            from rich import print
-            print('archdots\n')
-            print('{: <20}: {}'.format('config folder', CONFIG_FOLDER))
-            print('{: <20}: {}'.format('cache folder', CACHE_FOLDER))
-            print('{: <20}: {}'.format('chezmoi folder', CHEZMOI_FOLDER))
-            print('{: <20}: {}'.format('recognized platform', PLATFORM))
-            exit()
-
-        run_command(args, metadata_dict, parser_dict)
-
-        os.makedirs(CACHE_FOLDER, exist_ok=True)
-        with open(cached_command_tree_path, "w") as f:
-            f.write(command_tree_json)
-        with open(cached_metadata_dict_path, "w") as f:
-            json.dump(metadata_dict, f, cls=ExtendedJSONEncoder)
-
-    except (
-        PackageException,
-        PackageManagerException,
-        ParseException,
-        GuiException,
-        SettingsException,
-        CommandException,
-    ) as e:
+        status = dispatch(argv)
+    except ARCHDOTS_EXCEPTIONS as e:
         from rich.console import Console
 
         console = Console(stderr=True, style="bold red", markup=False, highlight=False)
@@ -97,3 +95,6 @@ def main():
         os._exit(1)
     except KeyboardInterrupt:
         pass
+
+    if status:
+        exit(status)
@@ -1,16 +1,16 @@
 import os
 import re
-from dacite import from_dict
-from dacite.exceptions import WrongTypeError
-import yaml
 
 from pathlib import Path
 from itertools import chain
 from typing import Any, Optional
 from argparse import _SubParsersAction, ArgumentParser, Namespace
 
-from archdots.constants import MODULE_PATH
+from archdots.constants import CACHE_FOLDER, MODULE_PATH
 from archdots.exceptions import ParseException
+from archdots.cache import load_cache, dump_cache
+from archdots.imports import lazy_import
+from archdots import yaml_io
 from archdots.schema import (
     Argument,
     Metadata,
@@ -19,6 +19,9 @@ from archdots.schema import (
     Argument,
 )
 
+# only needed when a command metadata is not cached
+dacite = lazy_import("dacite")
+
 MetadataDict = dict[str, Metadata]
 ParserDict = dict[str, tuple[Path, ArgumentParser]]
 
@@ -64,8 +67,11 @@ def extract_metadata(filepath: str | Path):
     if filepath.is_dir():
         return Metadata(help=f"{filepath.stem} help")
 
-    with open(filepath, "r") as f:
-        content = f.read()
+    try:
+        with open(filepath, "r") as f:
+            content = f.read()
+    except UnicodeDecodeError as e:
+        raise ParseException(f"not a text file: {e}", str(filepath))
 
     match = next(
         map(
@@ -79,19 +85,77 @@ def extract_metadata(filepath: str | Path):
         return Metadata(help=f"{filepath.stem} help")
 
     try:
-        return from_dict(Metadata, yaml.safe_load(match))
-    except WrongTypeError as e:
+        data = yaml_io.load(match)
+        if not isinstance(data, dict):
+            raise ParseException("the ARCHDOTS block must be a mapping", str(filepath))
+        return dacite.from_dict(Metadata, data)
+    except (dacite.DaciteError, yaml_io.yaml.YAMLError) as e:
+        # missing fields and invalid yaml are reported like wrong types
         raise ParseException(str(e), str(filepath))
 
 
+METADATA_CACHE = Path(CACHE_FOLDER) / "metadata.cache"
+METADATA_CACHE_VERSION = 2
+
+# filepath -> (mtime, size, metadata)
+MetadataCacheEntries = dict[str, tuple[float, int, Metadata]]
+
+
+class MetadataCache:
+    """
+    metadata of each command file, keyed by its path and revalidated by mtime and size.
+    only files that changed since they were cached are extracted again
+    """
+
+    def __init__(self) -> None:
+        self.entries = self._load()
+        self.updated: MetadataCacheEntries = {}
+
+    @staticmethod
+    def _load() -> MetadataCacheEntries:
+        entries = load_cache(METADATA_CACHE, METADATA_CACHE_VERSION)
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, filepath: str | Path) -> Metadata:
+        filepath = Path(filepath)
+        if not filepath.is_file():
+            return extract_metadata(filepath)
+
+        stat = filepath.stat()
+        key = str(filepath)
+        entry = self.entries.get(key)
+        if entry and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+            return entry[2]
+
+        # extract_metadata validates the metadata, so cached entries are loaded as is
+        metadata = extract_metadata(filepath)
+        self.entries[key] = self.updated[key] = (stat.st_mtime, stat.st_size, metadata)
+        return metadata
+
+    def save(self):
+        """
+        write the extracted entries. entries written meanwhile by another archdots process are kept
+        """
+        if not self.updated:
+            return
+
+        entries = {
+            path: entry
+            for path, entry in {**self._load(), **self.updated}.items()
+            if os.path.isfile(path)
+        }
+        dump_cache(METADATA_CACHE, METADATA_CACHE_VERSION, entries)
+        self.updated = {}
+
+
 def build_argparser(
     command_tree: CommandTreeNode,
-    metadata_dict: Optional[MetadataDict] = None,
+    metadata_cache: Optional[MetadataCache] = None,
 ) -> tuple[ArgumentParser, MetadataDict, ParserDict]:
     argparse_dict = {}
     parser_dict = {}
-    if not metadata_dict:
-        metadata_dict = {}
+    metadata_dict: MetadataDict = {}
+    get_metadata = metadata_cache.get if metadata_cache else extract_metadata
 
     pending_nodes = [command_tree]
     visited_nodes: list[CommandTreeNode] = []
@@ -128,7 +192,7 @@ def build_argparser(
             }
             parser_dict[name_path] = (node.path, parser)
             if name_path not in metadata_dict:
-                metadata_dict[name_path] = extract_metadata(node.path)
+                metadata_dict[name_path] = get_metadata(node.path)
 
             continue
 
@@ -145,7 +209,7 @@ def build_argparser(
 
         if not node.subcommands:
             if name_path not in metadata_dict:
-                metadata_dict[name_path] = extract_metadata(node.path)
+                metadata_dict[name_path] = get_metadata(node.path)
 
             parser = parser_from_metadata(
                 node.name,
@@ -162,10 +226,90 @@ def build_argparser(
     return argparse_dict[command_tree.name]["parser"], metadata_dict, parser_dict
 
 
+HELP_FLAGS = ["-h", "--help"]
+
+
+def resolve_command_path(
+    command_tree: CommandTreeNode, argv: list[str]
+) -> list[CommandTreeNode]:
+    """
+    returns the nodes selected by the leading subcommands of `argv`, starting at the root node
+    """
+    nodes = [command_tree]
+    for token in argv:
+        if token == "--" or token in HELP_FLAGS:
+            break
+        if token.startswith("-"):
+            continue
+
+        node = next(filter(lambda n: n.name == token, nodes[-1].subcommands), None)
+        if not node:
+            break
+        nodes.append(node)
+
+        if not node.subcommands:
+            break
+
+    return nodes
+
+
+def build_lazy_argparser(
+    command_tree: CommandTreeNode,
+    argv: list[str],
+    metadata_cache: Optional[MetadataCache] = None,
+) -> tuple[ArgumentParser, MetadataDict, ParserDict]:
+    """
+    same as `build_argparser`, but only creates parsers for the commands selected by `argv`.
+    the last selected command gets all of its subcommands, so its help and errors stay complete.
+    the whole tree is only built for the root help
+    """
+    nodes = resolve_command_path(command_tree, argv)
+    if len(nodes) == 1 and (not argv or any(arg in HELP_FLAGS for arg in argv)):
+        return build_argparser(command_tree, metadata_cache)
+
+    parser_dict: ParserDict = {}
+    metadata_dict: MetadataDict = {}
+    get_metadata = metadata_cache.get if metadata_cache else extract_metadata
+
+    # run_command expects the root to be the first key
+    name_path = command_tree.name
+    metadata_dict[name_path] = get_metadata(command_tree.path)
+
+    parser = ArgumentParser(prog=command_tree.name)
+    parser_dict[name_path] = (command_tree.path, parser)
+
+    for depth, node in enumerate(nodes):
+        if not node.subcommands:
+            break
+
+        subparser = parser.add_subparsers(dest=node.name)
+
+        next_node = nodes[depth + 1] if depth + 1 < len(nodes) else None
+        for child in [next_node] if next_node else node.subcommands:
+            child_name_path = os.path.join(name_path, child.name)
+            metadata_dict[child_name_path] = get_metadata(child.path)
+
+            if child.subcommands:
+                child_parser = subparser.add_parser(child.name, help="+")
+            else:
+                child_parser = parser_from_metadata(
+                    child.name, metadata_dict[child_name_path], subparser
+                )
+            parser_dict[child_name_path] = (child.path, child_parser)
+
+        if not next_node:
+            break
+
+        name_path = os.path.join(name_path, next_node.name)
+        parser = parser_dict[name_path][1]
+
+    return parser_dict[command_tree.name][1], metadata_dict, parser_dict
+
+
 def build_command_tree(roots: list[str], command_name: str):
     excluded_folders = ["__pycache__"]
 
-    root_node = CommandTreeNode(name=command_name, subcommands=[], path=Path(), mtime=0)
+    root_node = CommandTreeNode(name=command_name, subcommands=[], path=Path())
     current_node = [root_node]
     for current_folder, dirs, files in chain.from_iterable(
         os.walk(folder, topdown=True) for folder in roots
@@ -182,7 +326,6 @@ def build_command_tree(roots: list[str], command_name: str):
                 name=current_folder.name,
                 subcommands=[],
                 path=current_folder,
-                mtime=0,
             )
 
         for file in files:
@@ -192,7 +335,6 @@ def build_command_tree(roots: list[str], command_name: str):
                     name=file.stem,
                     subcommands=[],
                     path=filepath,
-                    mtime=filepath.stat().st_mtime,
                 )
             )
 
@@ -216,8 +358,91 @@ def build_command_tree(roots: list[str], command_name: str):
     return root_node
 
 
-def run_command(args: Namespace, metadata_dict: MetadataDict, parser_dict: ParserDict):
-    path = next(key for key in metadata_dict.keys())
+# reads the NUL separated key/value pairs written by `write_args` into the associative array "args" and sources the command
+SHELL_PRELUDE = """
+declare -A args
+while IFS= read -r -d '' key && IFS= read -r -d '' value; do
+  args["$key"]=$value
+done < "$ARCHDOTS_ARGS_FILE"
+unset key value
+source "$0"
+"""
+
+
+def arg_value(value: Any) -> str:
+    """
+    convert an argument into the string seen by shell commands
+    """
+    if isinstance(value, bool):
+        return str(int(value))
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(map(arg_value, value))
+    return str(value)
+
+
+def write_args(f, args_dict: dict[str, Any]):
+    for key, value in args_dict.items():
+        f.write(f"{key}\0{arg_value(value)}\0".encode())
+    f.flush()
+    f.seek(0)
+
+
+def exec_command(script_path: Path, args_dict: dict[str, Any]) -> int:
+    """
+    run a shell or executable command in place of the current process.
+    arguments are passed in a file referenced by ARCHDOTS_ARGS_FILE, so no value is ever parsed as shell code
+    """
+    import sys
+    import shutil
+    import tempfile
+
+    if str(script_path).endswith("sh"):
+        bash = shutil.which("bash")
+        if not bash:
+            raise ParseException("bash is required to run shell commands")
+        argv = [bash, "-c", SHELL_PRELUDE, str(script_path)]
+    else:
+        argv = [str(script_path)]
+
+    env = {
+        **os.environ,
+        "ARCHDOTS": f"{sys.executable} {os.path.join(MODULE_PATH, 'runner.py')}",
+    }
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    if os.name == "nt":
+        import subprocess
+
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            write_args(f, args_dict)
+        try:
+            env["ARCHDOTS_ARGS_FILE"] = f.name
+            return subprocess.call(argv, env=env)
+        finally:
+            os.unlink(f.name)
+
+    # the command replaces this process, so signals and the exit status reach the caller directly
+    f = tempfile.TemporaryFile()
+    write_args(f, args_dict)
+    os.set_inheritable(f.fileno(), True)
+    env["ARCHDOTS_ARGS_FILE"] = f"/dev/fd/{f.fileno()}"
+    try:
+        os.execve(argv[0], argv, env)
+    except OSError as e:
+        raise ParseException(f'could not run "{script_path}": {e.strerror}')
+
+
+def run_command(
+    args: Namespace, metadata_dict: MetadataDict, parser_dict: ParserDict
+) -> int:
+    """
+    run the command selected by `args`. returns its exit status
+    """
+    path = root_path = next(key for key in metadata_dict.keys())
 
     args_dict: dict[str, Any] = vars(args)
     # extract command path and arguments from argparse Namespace
@@ -232,45 +457,36 @@ def run_command(args: Namespace, metadata_dict: MetadataDict, parser_dict: Parse
 
     if script_path.is_dir():
         parser.print_help()
-        return
-
-    def parse_value(value, no_quotes=False):
-        quotes = lambda x: x if no_quotes else f'"{x}"'
-
-        if isinstance(value, bool):
-            return int(value)
-        if value is None:
-            return quotes("")
-        if isinstance(value, list):
-            return quotes(
-                " ".join(map(lambda x: str(parse_value(x, no_quotes=True)), value))
-            )
-        else:
-            return quotes(value)
+        return 0
 
-    if str(script_path).endswith(".py"):
-        import importlib.util
+    # options of the root parser, such as --info, are not arguments of the command
+    command_dests = {action.dest for action in parser._actions}
+    for action in parser_dict[root_path][1]._actions:
+        if action.dest not in command_dests:
+            args_dict.pop(action.dest, None)
 
-        # import python file and create a global variable named "args" that contains all passed arguments to the command
-        spec = importlib.util.spec_from_file_location(
-            os.path.basename(path), str(script_path)
-        )
-        if spec and spec.loader:
-            module = importlib.util.module_from_spec(spec)
-            module.__dict__["args"] = args_dict
-            spec.loader.exec_module(module)
-    else:
-        # convert all arguments into variable
-        bashdict = ""
-        for key, value in args_dict.items():
-            bashdict += f'["{key}"]={parse_value(value)} '
-        bashdict = "declare -A args=(" + bashdict.strip() + ")"
+    from archdots.daemon import changes_state, invalidate_daemon
 
-        command = f'ARCHDOTS="python {os.path.join(MODULE_PATH, "runner.py")}"\n'
+    if not str(script_path).endswith(".py"):
+        # the command replaces this process, so the daemon is told before it runs
+        if changes_state(path.split(os.sep)[1:]):
+            invalidate_daemon()
+        return exec_command(script_path, args_dict)
 
-        if str(script_path).endswith("sh"):
-            command += f"{bashdict}\nsource {str(script_path)}"
-        else:
-            command += f"{bashdict}\n./{str(script_path).replace(' ', '\\ ')}"
+    import importlib.util
+    from archdots.cache import load_code
 
-        os.system(command)
+    # import python file and create a global variable named "args" that contains all passed arguments to the command
+    spec = importlib.util.spec_from_file_location(
+        os.path.basename(path), str(script_path)
+    )
+    if spec and spec.loader:
+        module = importlib.util.module_from_spec(spec)
+        module.__dict__["args"] = args_dict
+        try:
+            # commands live outside any package, so their bytecode is cached in CACHE_FOLDER instead of __pycache__
+            exec(load_code(script_path), module.__dict__)
+        finally:
+            if changes_state(path.split(os.sep)[1:]):
+                invalidate_daemon()
+    return 0
@@ -0,0 +1,130 @@
+import os
+import pickle
+from pathlib import Path
+from types import CodeType
+from typing import Any
+
+from archdots.constants import CACHE_FOLDER
+from archdots.utils import atomic_write
+
+CACHE_MAGIC = b"ARCHDOTS"
+
+BYTECODE_FOLDER = Path(CACHE_FOLDER) / "bytecode"
+
+
+def _header(version: int) -> bytes:
+    return CACHE_MAGIC + version.to_bytes(2, "little")
+
+
+def load_cache(path: str | Path, version: int) -> Any | None:
+    """
+    returns the content of a cache file written by `dump_cache`.
+    returns `None` when the file is missing, corrupted or was written with another `version`
+    """
+    header = _header(version)
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(header)) != header:
+                return None
+            return pickle.load(f)
+    except Exception:
+        # pickle raises many kinds of errors on a corrupted file, any of them is a miss
+        return None
+
+
+def dump_cache(path: str | Path, version: int, data: Any):
+    """
+    atomically write `data` in a compact binary format.
+    the content is stored as is, so it must be validated before being cached
+    """
+    atomic_write(
+        path, _header(version) + pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    )
+
+
+# (path, mtime in ns, size) of a file used to build a snapshot
+SourceStat = tuple[str, int, int]
+
+
+def source_stat(path: str | Path) -> SourceStat:
+    stat = os.stat(path)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def load_snapshot(path: str | Path, version: int) -> Any | None:
+    """
+    returns the content of a snapshot written by `dump_snapshot`.
+    returns `None` when the file is missing, corrupted, was written with another `version` or one of its sources changed.
+    the content is only deserialized after all sources are checked
+    """
+    import hashlib
+
+    header = _header(version)
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(header)) != header:
+                return None
+            sources, digest = pickle.load(f)
+            for source in sources:
+                if source_stat(source[0]) != source:
+                    return None
+            payload = f.read()
+        if hashlib.sha1(payload).digest() != digest:
+            return None
+        return pickle.loads(payload)
+    except Exception:
+        # same as `load_cache`
+        return None
+
+
+def dump_snapshot(path: str | Path, version: int, sources: list[SourceStat], data: Any):
+    """
+    same as `dump_cache`, but the stats of the files `data` was built from and a hash of `data` are written before it.
+    `sources` must be taken before reading the files, so a file changed meanwhile invalidates the snapshot
+    """
+    import hashlib
+
+    payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    header = pickle.dumps(
+        (sources, hashlib.sha1(payload).digest()), protocol=pickle.HIGHEST_PROTOCOL
+    )
+    atomic_write(path, _header(version) + header + payload)
+
+
+def load_code(path: str | Path) -> CodeType:
+    """
+    returns the compiled code of the python file at `path`.
+    the code is cached in BYTECODE_FOLDER and reused while the file mtime, size and the interpreter magic number match
+    """
+    import hashlib
+    import marshal
+    import importlib.util
+
+    real_path = os.path.realpath(path)
+    # stat before reading, so a file changed meanwhile is recompiled next time
+    stat = os.stat(real_path)
+    header = (
+        importlib.util.MAGIC_NUMBER
+        + stat.st_mtime_ns.to_bytes(8, "little")
+        + stat.st_size.to_bytes(8, "little")
+    )
+    cache_path = BYTECODE_FOLDER / f"{hashlib.sha1(real_path.encode()).hexdigest()}.pyc"
+
+    try:
+        with open(cache_path, "rb") as f:
+            if f.read(len(header)) == header:
+                return marshal.load(f)
+    except Exception:
+        # a corrupted cache is recompiled
+        pass
+
+    with open(real_path, "rb") as f:
+        code = compile(f.read(), str(path), "exec", dont_inherit=True)
+
+    try:
+        atomic_write(cache_path, header + marshal.dumps(code))
+    except OSError:
+        # the command still runs without a cache
+        pass
+
+    return code
@@ -0,0 +1,130 @@
+import os
+from pathlib import Path
+from typing import Any
+
+from archdots.constants import CACHE_FOLDER
+from archdots.schema import CommandTreeNode
+from archdots.cache import load_cache, dump_cache
+
+COMMAND_INDEX = Path(CACHE_FOLDER) / "command_index.cache"
+COMMAND_INDEX_VERSION = 3
+
+EXCLUDED_FOLDERS = ["__pycache__"]
+
+# folder path -> {"mtime": float, "files": [filename], "dirs": [dirname]}.
+# files are not stated, editing one in place does not change the mtime of its folder
+FolderIndex = dict[str, dict[str, Any]]
+
+
+def _scan_folder(folder: str) -> dict[str, Any]:
+    """
+    list the files and subfolders of a single folder
+    """
+    files: list[str] = []
+    dirs: list[str] = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                # os.walk does not descend into symlinked folders either
+                if not entry.is_symlink() and entry.name not in EXCLUDED_FOLDERS:
+                    dirs.append(entry.name)
+            else:
+                files.append(entry.name)
+
+    return {
+        "mtime": os.stat(folder).st_mtime,
+        "files": sorted(files),
+        "dirs": sorted(dirs),
+    }
+
+
+def _refresh_folder(folder: str, cached: FolderIndex, index: FolderIndex) -> bool:
+    """
+    copy the entry of `folder` (and its subfolders) from `cached` into `index`, re-scanning only folders whose mtime changed.
+    returns `True` if anything differs from `cached`
+    """
+    try:
+        mtime = os.stat(folder).st_mtime
+    except FileNotFoundError:
+        return folder in cached
+
+    changed = False
+    entry = cached.get(folder)
+    if entry is None or entry["mtime"] != mtime:
+        entry = _scan_folder(folder)
+        changed = True
+
+    index[folder] = entry
+    for name in entry["dirs"]:
+        changed = _refresh_folder(os.path.join(folder, name), cached, index) or changed
+
+    return changed
+
+
+def load_command_index(roots: list[str]) -> tuple[FolderIndex, bool]:
+    """
+    returns the index of all command roots and whether it differs from the one stored in CACHE_FOLDER.
+    only folders whose mtime changed since the last run are listed again
+    """
+    cached: FolderIndex = {}
+    data = load_cache(COMMAND_INDEX, COMMAND_INDEX_VERSION)
+    if isinstance(data, dict) and data.get("roots") == roots:
+        cached = data["folders"]
+
+    index: FolderIndex = {}
+    changed = False
+    for root in roots:
+        changed = _refresh_folder(root, cached, index) or changed
+
+    return index, changed or index.keys() != cached.keys()
+
+
+def save_command_index(roots: list[str], index: FolderIndex):
+    dump_cache(COMMAND_INDEX, COMMAND_INDEX_VERSION, {"roots": roots, "folders": index})
+
+
+def command_tree_from_index(
+    roots: list[str], index: FolderIndex, command_name: str
+) -> CommandTreeNode:
+    """
+    same tree as `build_command_tree`, built from an index instead of walking the roots
+    """
+    root_node = CommandTreeNode(name=command_name, subcommands=[], path=Path())
+
+    def add_folder(folder: str, node: CommandTreeNode):
+        if folder not in index:
+            return
+        entry = index[folder]
+
+        for filename in entry["files"]:
+            node.subcommands.append(
+                CommandTreeNode(
+                    name=Path(filename).stem,
+                    subcommands=[],
+                    path=Path(folder) / filename,
+                )
+            )
+
+        for dirname in entry["dirs"]:
+            subfolder = os.path.join(folder, dirname)
+            path = Path(subfolder)
+
+            # a file with the same name as the folder holds the folder metadata
+            if subfolder in index and (
+                node_file := next(
+                    filter(
+                        lambda f: Path(f).stem == dirname, index[subfolder]["files"]
+                    ),
+                    None,
+                )
+            ):
+                path = path / node_file
+
+            subnode = CommandTreeNode(name=dirname, subcommands=[], path=path)
+            node.subcommands.append(subnode)
+            add_folder(subfolder, subnode)
+
+    for root in roots:
+        add_folder(root, root_node)
+
+    return root_node
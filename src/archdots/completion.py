@@ -0,0 +1,109 @@
+from pathlib import Path
+
+from archdots.cache import dump_cache, load_cache
+from archdots.constants import CACHE_FOLDER, MODULE_PATH
+from archdots.exceptions import ParseException
+from archdots.schema import CommandTreeNode
+from archdots.utils import atomic_write
+
+COMPLETION_INDEX = Path(CACHE_FOLDER) / "completion.tsv"
+COMPLETION_SCRIPTS = Path(MODULE_PATH) / "completions"
+
+# lines of each command in COMPLETION_INDEX, revalidated by the mtime and size of its file
+COMPLETION_ROWS = Path(CACHE_FOLDER) / "completion.cache"
+COMPLETION_ROWS_VERSION = 1
+
+# command file -> (mtime, size, subcommand path, lines)
+CompletionRows = dict[str, tuple[float, int, str, list[str]]]
+
+# options added by the dispatcher to the root parser
+ROOT_OPTIONS = ["--info", "--profile-imports"]
+HELP_OPTIONS = ["-h", "--help"]
+
+
+def completion_lines(
+    command_tree: CommandTreeNode,
+    get_metadata,
+    cached_rows: CompletionRows | None = None,
+    rows: CompletionRows | None = None,
+) -> list[str]:
+    """
+    one line per command: "<subcommand path>\t<subcommands>\t<options>\t<choices>".
+    flags with choices get their own line, keyed by "<subcommand path> <flag>".
+    commands in `cached_rows` whose file kept its mtime and size reuse their lines, so their metadata is not read.
+    the lines of every command are stored in `rows`
+    """
+    cached_rows = cached_rows or {}
+    rows = {} if rows is None else rows
+    lines = []
+
+    def format_line(key: str, subcommands: list[str], options: list[str], choices):
+        return "\t".join(
+            [key, " ".join(subcommands), " ".join(options), " ".join(choices)]
+        )
+
+    def command_lines(node: CommandTreeNode, key: str) -> list[str]:
+        try:
+            metadata = get_metadata(node.path)
+        except ParseException:
+            # broken commands are reported when they are run
+            return []
+
+        node_lines = []
+        options = [*HELP_OPTIONS]
+        for flag in metadata.flags:
+            options.extend(filter(None, [flag.short, flag.long]))
+            if flag.choices:
+                for option in filter(None, [flag.short, flag.long]):
+                    node_lines.append(
+                        format_line(f"{key} {option}", [], [], map(str, flag.choices))
+                    )
+
+        choices = [str(c) for argument in metadata.arguments for c in argument.choices]
+        return [format_line(key, [], options, choices), *node_lines]
+
+    def add_node(node: CommandTreeNode, key: str):
+        if node.subcommands:
+            options = [*HELP_OPTIONS, *(ROOT_OPTIONS if not key else [])]
+            lines.append(
+                format_line(key, [n.name for n in node.subcommands], options, [])
+            )
+            for subnode in node.subcommands:
+                add_node(subnode, f"{key} {subnode.name}".strip())
+            return
+
+        try:
+            stat = node.path.stat()
+        except OSError:
+            # broken symlinks can not be run either
+            return
+
+        path = str(node.path)
+        entry = cached_rows.get(path)
+        if entry and entry[:3] == (stat.st_mtime, stat.st_size, key):
+            node_lines = entry[3]
+        else:
+            node_lines = command_lines(node, key)
+        rows[path] = (stat.st_mtime, stat.st_size, key, node_lines)
+        lines.extend(node_lines)
+
+    add_node(command_tree, "")
+    return lines
+
+
+def update_completion_index(command_tree: CommandTreeNode, get_metadata):
+    """
+    write the completion index read by the shell completion scripts in COMPLETION_SCRIPTS when a command was added,
+    removed or edited. only the commands whose file changed are read again
+    """
+    cached_rows = load_cache(COMPLETION_ROWS, COMPLETION_ROWS_VERSION)
+    if not isinstance(cached_rows, dict):
+        cached_rows = {}
+
+    rows: CompletionRows = {}
+    lines = completion_lines(command_tree, get_metadata, cached_rows, rows)
+    if rows == cached_rows and COMPLETION_INDEX.exists():
+        return
+
+    atomic_write(COMPLETION_INDEX, "\n".join(lines) + "\n")
+    dump_cache(COMPLETION_ROWS, COMPLETION_ROWS_VERSION, rows)
@@ -1,12 +1,29 @@
 from typing import Any
-from rich.console import Console
 from typing import TypeVar, ParamSpec
 from collections.abc import Callable
 import functools
-from rich.progress import Progress
 
-warn_console = Console(style="yellow italic", stderr=True)
-err_console = Console(style="red", stderr=True)
+from archdots.imports import lazy_import
+
+rich_console = lazy_import("rich.console")
+rich_progress = lazy_import("rich.progress")
+
+CONSOLE_STYLES = {
+    "warn_console": "yellow italic",
+    "err_console": "red",
+}
+
+
+def __getattr__(name: str):
+    """
+    warn_console and err_console are only created (and rich imported) on first use
+    """
+    if name not in CONSOLE_STYLES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    console = rich_console.Console(style=CONSOLE_STYLES[name], stderr=True)
+    globals()[name] = console
+    return console
 
 
 def title(*content: Any, color="cyan"):
@@ -29,7 +46,7 @@ def transient_progress(description: str):
         @functools.wraps(f)
         def wrapper(*args: P.args, **kwargs: P.kwargs):
 
-            with Progress(transient=True) as progress:
+            with rich_progress.Progress(transient=True) as progress:
                 progress.add_task(str(description), total=None)
                 return f(*args, **kwargs)
 
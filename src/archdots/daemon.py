@@ -0,0 +1,298 @@
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+from archdots.constants import (
+    CACHE_FOLDER,
+    CONFIG_FOLDER,
+    HEALTH_FOLDER,
+    PACKAGES_FOLDER,
+)
+from archdots.exceptions import (
+    ARCHDOTS_EXCEPTIONS,
+    CommandException,
+    SettingsException,
+)
+
+DAEMON_SOCKET = Path(CACHE_FOLDER) / "daemon.sock"
+
+# read-only commands answered by the daemon. anything else runs in the calling process.
+# commands that spawn processes writing to the terminal cannot be listed here
+DAEMON_COMMANDS = [
+    ["status"],
+    ["pkg", "list"],
+    ["settings", "dump"],
+    ["settings", "query"],
+]
+
+# installing or removing packages touches these folders
+PACKAGE_DATABASES = ["/var/lib/pacman/local"]
+
+# commands that install or remove custom packages or configure health scripts. whether those are installed is only
+# known by running their check(), so the daemon is told to drop it. config files, PKGBUILDs and the pacman database
+# are watched by the daemon itself
+STATE_COMMANDS = [
+    ["sync"],
+    ["gui"],
+    ["pkg", "sync"],
+    ["pkg", "review"],
+    ["pkg", "delete"],
+    ["health", "configure"],
+    ["health", "unconfigure"],
+    ["health", "delete"],
+]
+
+# frames sent from the daemon to the client: 1 byte kind + 4 bytes length + payload
+STDOUT_FRAME = b"o"
+STDERR_FRAME = b"e"
+EXIT_FRAME = b"x"
+
+
+def _send_frame(connection, kind: bytes, payload: bytes):
+    connection.sendall(kind + len(payload).to_bytes(4, "big") + payload)
+
+
+def _recv_exactly(connection, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("daemon closed the connection")
+        data += chunk
+    return data
+
+
+def _connect():
+    import socket
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(str(DAEMON_SOCKET))
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+
+def _send_request(request: dict[str, Any]):
+    import json
+
+    connection = _connect()
+    connection.sendall(json.dumps(request).encode() + b"\n")
+    return connection
+
+
+def is_daemon_command(argv: list[str]) -> bool:
+    return any(argv[: len(command)] == command for command in DAEMON_COMMANDS)
+
+
+def changes_state(command: list[str]) -> bool:
+    """
+    whether the command at the subcommand path `command` may change what the daemon holds without it noticing
+    """
+    return any(command[: len(state)] == state for state in STATE_COMMANDS)
+
+
+def forward_to_daemon(argv: list[str]) -> int | None:
+    """
+    run a read-only command on the daemon, streaming its output.
+    returns the exit status, or `None` when the command must run locally
+    """
+    if os.name == "nt" or not is_daemon_command(argv) or not DAEMON_SOCKET.exists():
+        return None
+
+    try:
+        connection = _send_request({"argv": argv, "cwd": os.getcwd()})
+    except OSError:
+        return None
+
+    received_output = False
+    with connection:
+        try:
+            while True:
+                header = _recv_exactly(connection, 5)
+                payload = _recv_exactly(connection, int.from_bytes(header[1:], "big"))
+
+                match header[:1]:
+                    case b"o":
+                        stream = sys.stdout
+                    case b"e":
+                        stream = sys.stderr
+                    case _:
+                        return int(payload)
+
+                received_output = True
+                stream.buffer.write(payload)
+                stream.flush()
+        except OSError:
+            # nothing was printed yet, so it is safe to run the command locally
+            if not received_output:
+                return None
+            print("archdots daemon stopped unexpectedly", file=sys.stderr)
+            return 1
+
+
+def invalidate_daemon():
+    """
+    tell the daemon to drop everything it holds in memory
+    """
+    if os.name == "nt" or not DAEMON_SOCKET.exists():
+        return
+    try:
+        _send_request({"invalidate": True}).close()
+    except OSError:
+        pass
+
+
+def stop_daemon():
+    if not DAEMON_SOCKET.exists():
+        raise CommandException("archdots daemon is not running")
+    try:
+        _send_request({"stop": True}).close()
+    except OSError:
+        raise CommandException("archdots daemon is not running")
+
+
+class _FrameWriter:
+    """
+    file-like object that sends everything written to it as frames of `kind`
+    """
+
+    encoding = "utf-8"
+
+    def __init__(self, connection, kind: bytes) -> None:
+        self.connection = connection
+        self.kind = kind
+
+    def write(self, text: str) -> int:
+        if text:
+            _send_frame(self.connection, self.kind, text.encode(self.encoding))
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def _watched_files() -> list[Path]:
+    from archdots.settings import config_files, config_folders
+
+    # a broken config is reported by the commands themselves
+    try:
+        files = [Path(CONFIG_FOLDER), *config_files(), *config_folders()]
+    except SettingsException:
+        files = [Path(CONFIG_FOLDER), Path(CONFIG_FOLDER) / "config.yaml"]
+    for folder in (PACKAGES_FOLDER, HEALTH_FOLDER):
+        for root, dirs, filenames in os.walk(folder):
+            files.append(Path(root))
+            if "PKGBUILD" in filenames:
+                files.append(Path(root) / "PKGBUILD")
+    return [*files, *map(Path, PACKAGE_DATABASES)]
+
+
+def _mtimes(files: list[Path]) -> dict[Path, float | None]:
+    mtimes = {}
+    for file in files:
+        try:
+            mtimes[file] = file.stat().st_mtime
+        except OSError:
+            mtimes[file] = None
+    return mtimes
+
+
+def _run_request(connection, request: dict[str, Any]) -> int:
+    from contextlib import redirect_stdout, redirect_stderr
+    from archdots import dispatch
+
+    stdout = _FrameWriter(connection, STDOUT_FRAME)
+    stderr = _FrameWriter(connection, STDERR_FRAME)
+
+    cwd = os.getcwd()
+    try:
+        os.chdir(request["cwd"])
+        with redirect_stdout(stdout), redirect_stderr(stderr):  # type: ignore
+            try:
+                return dispatch(request["argv"])
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    return e.code or 0
+                print(e.code, file=sys.stderr)
+                return 1
+            except ARCHDOTS_EXCEPTIONS as e:
+                print(e, file=sys.stderr)
+                return 1
+            except Exception:
+                import traceback
+
+                traceback.print_exc()
+                return 1
+    finally:
+        os.chdir(cwd)
+
+
+def serve():
+    """
+    answer the commands in DAEMON_COMMANDS from a unix socket, keeping the parsed config, packages and
+    installed packages in memory. everything is dropped when one of the watched files changes or another
+    archdots process asks for it
+    """
+    if os.name == "nt":
+        raise CommandException("archdots daemon is only available on linux")
+
+    import json
+    import socket
+    from archdots.settings import clear_config_memo
+    from archdots.utils import keep_memo, clear_memo
+
+    if DAEMON_SOCKET.exists():
+        try:
+            _connect().close()
+            raise CommandException("archdots daemon is already running")
+        except OSError:
+            # left behind by a daemon that did not stop cleanly
+            DAEMON_SOCKET.unlink()
+
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(DAEMON_SOCKET))
+    os.chmod(DAEMON_SOCKET, 0o600)
+    server.listen()
+    print(f"listening on {DAEMON_SOCKET}")
+
+    keep_memo()
+    watched = _mtimes(_watched_files())
+
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                try:
+                    with connection.makefile("rb") as f:
+                        request = json.loads(f.readline())
+                except (OSError, ValueError):
+                    continue
+
+                if request.get("stop"):
+                    break
+
+                if request.get("invalidate") or _mtimes(list(watched)) != watched:
+                    clear_memo()
+                    clear_config_memo()
+                    watched = _mtimes(_watched_files())
+
+                if "argv" not in request:
+                    continue
+
+                try:
+                    status = _run_request(connection, request)
+                    _send_frame(connection, EXIT_FRAME, str(status).encode())
+                except OSError:
+                    # the client went away
+                    pass
+    finally:
+        server.close()
+        DAEMON_SOCKET.unlink(missing_ok=True)
+        keep_memo(False)
@@ -37,3 +37,19 @@ class SettingsException(Exception):
 
 class CommandException(Exception):
     pass
+
+
+class QueryException(Exception):
+    pass
+
+
+# exceptions reported to the user as a message, without a traceback
+ARCHDOTS_EXCEPTIONS = (
+    PackageException,
+    PackageManagerException,
+    ParseException,
+    GuiException,
+    SettingsException,
+    CommandException,
+    QueryException,
+)
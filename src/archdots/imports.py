@@ -0,0 +1,93 @@
+import re
+import sys
+import importlib.util
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    returns a module that is only executed when one of its attributes is accessed.
+    used for heavy dependencies that most commands never touch
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+IMPORT_TIME_REGEX = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def parse_import_times(lines: list[str]) -> dict[str, int]:
+    """
+    given the output of `python -X importtime`, returns the self import time (us) of each module
+    """
+    import_times: dict[str, int] = {}
+    for line in lines:
+        if match := IMPORT_TIME_REGEX.match(line.rstrip("\n")):
+            import_times[match.group(4)] = int(match.group(1))
+    return import_times
+
+
+def aggregate_import_times(import_times: dict[str, int]) -> dict[str, tuple[int, int]]:
+    """
+    group the self import times by top-level package. returns package -> (modules, time in us)
+    """
+    packages: dict[str, tuple[int, int]] = {}
+    for module, import_time in import_times.items():
+        package = module.split(".")[0]
+        modules, total = packages.get(package, (0, 0))
+        packages[package] = (modules + 1, total + import_time)
+    return dict(sorted(packages.items(), key=lambda item: item[1][1], reverse=True))
+
+
+def profile_imports(argv: list[str]) -> int:
+    """
+    run dots again with `-X importtime` and print its import time grouped by top-level package.
+    modules imported by the bare interpreter startup (site, encodings...) are not included
+    """
+    import subprocess
+
+    def run(code: str, args: list[str]):
+        process = subprocess.Popen(
+            [sys.executable, "-X", "importtime", "-c", code, *args],
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        lines = []
+        for line in process.stderr or []:
+            if line.startswith("import time:"):
+                lines.append(line)
+            else:
+                sys.stderr.write(line)
+        process.wait()
+        return process.returncode, parse_import_times(lines)
+
+    _, startup_times = run("pass", [])
+    returncode, import_times = run("import archdots; archdots.main()", argv)
+
+    packages = aggregate_import_times(
+        {k: v for k, v in import_times.items() if k not in startup_times}
+    )
+
+    print("\n{: <20} {: >8} {: >10}".format("package", "modules", "self (ms)"))
+    for package, (modules, total) in packages.items():
+        print("{: <20} {: >8} {: >10.2f}".format(package, modules, total / 1000))
+    print(
+        "{: <20} {: >8} {: >10.2f}".format(
+            "total",
+            sum(modules for modules, _ in packages.values()),
+            sum(total for _, total in packages.values()) / 1000,
+        )
+    )
+
+    return returncode
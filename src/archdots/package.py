@@ -6,6 +6,7 @@ import re
 from dataclasses import dataclass
 from archdots.constants import CACHE_FOLDER, PLATFORM, PLATFORM
 from archdots.utils import is_url_valid
+from archdots.cache import load_cache, dump_cache
 from archdots.exceptions import PackageException
 from archdots.console import print_title
 from pathlib import Path
@@ -14,6 +15,17 @@ from shutil import which
 
 PWSH_AVAILABLE = which("winget") is not None
 
+PACKAGE_CACHE = Path(CACHE_FOLDER) / "packages.cache"
+PACKAGE_CACHE_VERSION = 1
+
+# processes (bash on linux) parsing PKGBUILDs at the same time, each one gets at least PARSER_CHUNK_SIZE PKGBUILDs
+PARSER_WORKERS = os.cpu_count() or 1
+PARSER_CHUNK_SIZE = 16
+
+ParsedPackage = tuple[dict[str, Any], list[str]]
+# PKGBUILD path -> (mtime in ns, size, sha1 of its content, fields, functions)
+PackageCacheEntries = dict[str, tuple[int, int, bytes, dict[str, Any], list[str]]]
+
 
 @dataclass
 class Package:
@@ -174,27 +186,12 @@ class Package:
                     hashtable += f'"{i}" = "{folder}"\n'
                 hashtable += "}"
 
-            from archdots.package_parser import parser, PackageTransformer, Function
-
-            with open(self.pkgbuild, "r") as f:
-                text = f.read()
-            tree = parser.parse(text)
-            parsed_functions: list[Function] = [
-                f
-                for f in PackageTransformer().transform(tree)
-                if isinstance(f, Function)
-            ]
-
-            found_function = next(
-                filter(
-                    lambda item: item.name == name,
-                    parsed_functions,
-                ),
-                None,
-            )
+            from archdots.package_parser import find_function
+
+            found_function = find_function(self.pkgbuild, name)
             if not found_function:
                 raise PackageException(
-                    f'tried to executed an unknown PKGBUILD function "{found_function}"',
+                    f'tried to executed an unknown PKGBUILD function "{name}"',
                     self,
                 )
 
@@ -305,76 +302,128 @@ def get_packages(folder: str, ignore_platform=False) -> list[Package]:
         dirs[:] = []
         filtered_packages.append(root)
 
-    packages = [package_from_path(pkgbuild_path) for pkgbuild_path in filtered_packages]
+    # os.walk order depends on the filesystem
+    filtered_packages.sort()
+
+    packages = packages_from_paths(filtered_packages, folder)
     if ignore_platform:
         return packages
     return list(filter(lambda pkg: PLATFORM == pkg.platform, packages))
 
 
-def parse_package_bash(pkgbuild_path: str | Path) -> tuple[dict[str, Any], list[str]]:
-    pkgbuild_path = Path(pkgbuild_path)
-    pkg_name = pkgbuild_path.parent.stem
-
-    known_fields = [
-        "depends",
-        "description",
-        "source",
-        "url",
-    ]
-    optional_fields = ["platform", "source_on_check"]
-    known_funcs = [
-        "check",
-        "install",
-        "uninstall",
-    ]
-    command = f"""
-    prev="$(declare -p)"
-    source {pkgbuild_path}
-    diff <(cat<<<$prev) <(declare -p) |cut -d' ' -f4-|grep -E '^({'|'.join([*known_fields, *optional_fields])})'
-    echo ===
-    declare -F|cut -d' ' -f3-|grep -E '^({'|'.join(known_funcs)})'
+KNOWN_FIELDS = [
+    "depends",
+    "description",
+    "source",
+    "url",
+]
+OPTIONAL_FIELDS = ["platform", "source_on_check"]
+KNOWN_FUNCS = [
+    "check",
+    "install",
+    "uninstall",
+]
+# functions listed in Package.available_functions
+FUNCS_REGEX = re.compile(rf"^({'|'.join(KNOWN_FUNCS)})")
+
+# sources each PKGBUILD given as argument in its own subshell and prints NUL separated records:
+#   P <pkgbuild>                      start of a PKGBUILD
+#   V <field> <value>                 string field
+#   A <field> <length> <items...>     array field
+#   F <functions separated by \n>
+BATCH_PARSER_SCRIPT = f"""
+__archdots_field() {{
+    local -n __archdots_value=$1
+    if [[ ${{__archdots_value@a}} == *a* ]]; then
+        printf 'A\\0%s\\0%d\\0' "$1" "${{#__archdots_value[@]}}"
+        (( ${{#__archdots_value[@]}} )) && printf '%s\\0' "${{__archdots_value[@]}}"
+    else
+        printf 'V\\0%s\\0%s\\0' "$1" "$__archdots_value"
+    fi
+}}
+for __archdots_pkgbuild in "$@"; do
+    printf 'P\\0%s\\0' "$__archdots_pkgbuild"
+    (
+        unset {' '.join([*KNOWN_FIELDS, *OPTIONAL_FIELDS])}
+        source "$__archdots_pkgbuild" >/dev/null 2>&1 </dev/null
+        for __archdots_name in {' '.join([*KNOWN_FIELDS, *OPTIONAL_FIELDS])}; do
+            declare -p "$__archdots_name" &>/dev/null && __archdots_field "$__archdots_name"
+        done
+        printf 'F\\0'
+        compgen -A function
+        printf '\\0'
+    )
+done
+"""
+
+
+def parse_packages_bash(
+    pkgbuild_paths: list[str] | list[Path],
+) -> dict[Path, tuple[dict[str, Any], list[str]]]:
+    """
+    source every PKGBUILD in a single bash process, each one in its own subshell.
+    returns the known fields and functions of each PKGBUILD
     """
+    pkgbuild_paths = [Path(p) for p in pkgbuild_paths]
+    if not pkgbuild_paths:
+        return {}
 
-    process = subprocess.Popen(
-        command,
+    process = subprocess.run(
+        ["bash", "-c", BATCH_PARSER_SCRIPT, "bash", *map(str, pkgbuild_paths)],
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        stdin=subprocess.PIPE,
-        shell=True,
-        text=True,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
     )
-    if not process.stdout:
-        raise PackageException(
-            "could not read PKGBUILD", pkg_name=pkg_name, pkgbuild=str(pkgbuild_path)
-        )
 
-    vars_text, func_text, *_ = process.stdout.read().split("===")
-
-    def parse_value(value) -> str | list[str]:
-        """
-        convert bash-style variables into text
-        """
-        string_regex = re.compile(r'^"(.+)"$')
-        array_regex = re.compile(r'\[[0-9]\]="(.+?)"')
-        if re.match(string_regex, value):
-            return re.findall(string_regex, value)[0].strip()
-        else:
-            return re.findall(array_regex, value)
+    parsed: dict[Path, tuple[dict[str, Any], list[str]]] = {}
+    tokens = iter(process.stdout.decode(errors="replace").split("\0"))
+    fields_dict: dict[str, Any] = {}
+    funcs: list[str] = []
+    for kind in tokens:
+        match kind:
+            case "P":
+                pkgbuild_path = Path(next(tokens))
+                fields_dict, funcs = {}, []
+                parsed[pkgbuild_path] = (fields_dict, funcs)
+            case "V":
+                field = next(tokens)
+                fields_dict[field] = next(tokens).strip()
+            case "A":
+                field = next(tokens)
+                fields_dict[field] = [next(tokens) for _ in range(int(next(tokens)))]
+            case "F":
+                funcs.extend(filter(FUNCS_REGEX.match, next(tokens).splitlines()))
+
+    for pkgbuild_path in pkgbuild_paths:
+        if pkgbuild_path not in parsed:
+            raise PackageException(
+                "could not read PKGBUILD",
+                pkg_name=pkgbuild_path.parent.stem,
+                pkgbuild=str(pkgbuild_path),
+            )
+    return parsed
 
-    fields = re.findall(r"^(\w+?)=(.+)\n", vars_text, flags=re.MULTILINE)
-    fields_dict: dict[str, Any] = {key: parse_value(value) for key, value in fields}
-    funcs = list(filter(str, func_text.splitlines()))
 
-    return fields_dict, funcs
+def parse_package_bash(pkgbuild_path: str | Path) -> tuple[dict[str, Any], list[str]]:
+    return parse_packages_bash([pkgbuild_path])[Path(pkgbuild_path)]
 
 
-def parse_package_lark(pkgbuild_path: str | Path) -> tuple[dict[str, Any], list[str]]:
-    from archdots.package_parser import parser, PackageTransformer, Function, Item
+def parse_package_static(pkgbuild_path: str | Path) -> ParsedPackage | None:
+    """
+    read the fields and functions of a PKGBUILD without running it.
+    returns None when it is not made only of literal assignments and function declarations
+    """
+    from archdots.static_pkgbuild import extract_static
 
     with open(pkgbuild_path, "r") as f:
         text = f.read()
-    tree = parser.parse(text)
-    parsed_items: list[Function | Item] = PackageTransformer().transform(tree)
+    return extract_static(text, [*KNOWN_FIELDS, *OPTIONAL_FIELDS], FUNCS_REGEX)
+
+
+def parse_package_lark(pkgbuild_path: str | Path) -> tuple[dict[str, Any], list[str]]:
+    from archdots.package_parser import parse_pkgbuild, Function, Item
+
+    parsed_items = parse_pkgbuild(pkgbuild_path)
 
     fields_dict = {
         item.key: item.value for item in parsed_items if isinstance(item, Item)
@@ -384,48 +433,37 @@ def parse_package_lark(pkgbuild_path: str | Path) -> tuple[dict[str, Any], list[
     return fields_dict, funcs
 
 
-def package_from_path(folder_path: str | Path) -> Package:
+def package_from_fields(
+    folder_path: str | Path, fields_dict: dict[str, Any], funcs: list[str]
+) -> Package:
     """
-    given a path to a folder that contains a PKGBUILD, run it and extract all desired fields.
+    validate the fields and functions parsed from the PKGBUILD inside `folder_path` and build its Package.
     raise an error when there is some funciton/field missing.
     """
     folder_path = Path(folder_path)
     pkg_name = folder_path.stem
     pkgbuild_path = folder_path / "PKGBUILD"
 
-    if PLATFORM == "linux":
-        fields_dict, funcs = parse_package_bash(pkgbuild_path)
-    else:
-        fields_dict, funcs = parse_package_lark(pkgbuild_path)
-
-    known_fields = [
-        "depends",
-        "description",
-        "source",
-        "url",
-    ]
-    known_funcs = [
-        "check",
-        "install",
-        "uninstall",
-    ]
-
-    if missing_fields := set(known_fields).difference(fields_dict.keys()):
+    if missing_fields := set(KNOWN_FIELDS).difference(fields_dict.keys()):
         raise PackageException(
             f"missing fields: {list(missing_fields)}",
             pkg_name=pkg_name,
             pkgbuild=str(pkgbuild_path),
         )
-    if missing_funcs := set(known_funcs).difference(funcs):
+    if missing_funcs := set(KNOWN_FUNCS).difference(funcs):
         raise PackageException(
             f"missing functions: {list(missing_funcs)}",
             pkg_name=pkg_name,
             pkgbuild=str(pkgbuild_path),
         )
 
-    fields_dict["depends"] = [
-        ("custom:" + dep if ":" not in dep else dep) for dep in fields_dict["depends"]
-    ]
+    fields_dict = {
+        **fields_dict,
+        "depends": [
+            ("custom:" + dep if ":" not in dep else dep)
+            for dep in fields_dict["depends"]
+        ],
+    }
 
     if "platform" in fields_dict and fields_dict["platform"] not in [
         "linux",
@@ -443,3 +481,137 @@ def package_from_path(folder_path: str | Path) -> Package:
         available_functions=funcs,
         **fields_dict,
     )
+
+
+def package_from_path(folder_path: str | Path) -> Package:
+    """
+    given a path to a folder that contains a PKGBUILD, run it and extract all desired fields.
+    raise an error when there is some funciton/field missing.
+    """
+    return packages_from_paths([folder_path])[0]
+
+
+def parse_packages_concurrently(
+    pkgbuild_paths: list[Path],
+) -> dict[Path, ParsedPackage]:
+    """
+    split the PKGBUILDs in chunks parsed by up to PARSER_WORKERS threads, each one running a single bash process on linux
+    """
+
+    def parse_chunk(chunk: list[Path]) -> dict[Path, ParsedPackage]:
+        if PLATFORM == "linux":
+            return parse_packages_bash(chunk)
+        return {path: parse_package_lark(path) for path in chunk}
+
+    chunk_size = max(PARSER_CHUNK_SIZE, -(-len(pkgbuild_paths) // PARSER_WORKERS))
+    chunks = [
+        pkgbuild_paths[i : i + chunk_size]
+        for i in range(0, len(pkgbuild_paths), chunk_size)
+    ]
+    if not chunks:
+        return {}
+    if len(chunks) == 1:
+        return parse_chunk(pkgbuild_paths)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    parsed: dict[Path, ParsedPackage] = {}
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        for chunk_parsed in pool.map(parse_chunk, chunks):
+            parsed.update(chunk_parsed)
+    return parsed
+
+
+def parse_packages(
+    pkgbuild_paths: list[Path], folder: str | Path | None = None
+) -> dict[Path, ParsedPackage]:
+    """
+    returns the fields and functions of each PKGBUILD. they are cached in PACKAGE_CACHE, keyed by path and revalidated by
+    mtime and size, or by a hash of the content when those changed. only new or changed PKGBUILDs are parsed,
+    on linux statically when possible and by bash otherwise.
+    cached PKGBUILDs inside `folder` that are not in `pkgbuild_paths` anymore are dropped
+    """
+    import hashlib
+
+    entries: PackageCacheEntries = (
+        load_cache(PACKAGE_CACHE, PACKAGE_CACHE_VERSION) or {}
+    )
+    updated = False
+
+    parsed: dict[Path, ParsedPackage] = {}
+    # PKGBUILD -> (mtime in ns, size, sha1) of the ones that must be parsed
+    pending: dict[Path, tuple[int, int, bytes]] = {}
+    for pkgbuild_path in pkgbuild_paths:
+        key = str(pkgbuild_path)
+        stat = pkgbuild_path.stat()
+        entry = entries.get(key)
+        if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            parsed[pkgbuild_path] = (entry[3], entry[4])
+            continue
+
+        digest = hashlib.sha1(pkgbuild_path.read_bytes()).digest()
+        if entry and entry[2] == digest:
+            entries[key] = (stat.st_mtime_ns, stat.st_size, *entry[2:])
+            parsed[pkgbuild_path] = (entry[3], entry[4])
+            updated = True
+            continue
+        pending[pkgbuild_path] = (stat.st_mtime_ns, stat.st_size, digest)
+
+    if pending:
+        new_parsed: dict[Path, ParsedPackage] = {}
+        if PLATFORM == "linux":
+            for pkgbuild_path in pending:
+                if (static_parsed := parse_package_static(pkgbuild_path)) is not None:
+                    new_parsed[pkgbuild_path] = static_parsed
+        new_parsed.update(
+            parse_packages_concurrently(
+                [path for path in pending if path not in new_parsed]
+            )
+        )
+        for pkgbuild_path, (fields_dict, funcs) in new_parsed.items():
+            entries[str(pkgbuild_path)] = (*pending[pkgbuild_path], fields_dict, funcs)
+        parsed.update(new_parsed)
+        updated = True
+
+    if folder is not None:
+        folder_prefix = os.path.join(os.path.abspath(folder), "")
+        current = set(map(str, pkgbuild_paths))
+        for key in list(entries):
+            if key.startswith(folder_prefix) and key not in current:
+                del entries[key]
+                updated = True
+
+    if updated:
+        dump_cache(PACKAGE_CACHE, PACKAGE_CACHE_VERSION, entries)
+
+    return parsed
+
+
+def packages_from_paths(
+    folder_paths: list[str] | list[Path], folder: str | Path | None = None
+) -> list[Package]:
+    """
+    same as `package_from_path` for many folders, in the same order. PKGBUILDs that are not in PACKAGE_CACHE are parsed
+    concurrently and a single PackageException reports every invalid package. `folder` is passed to `parse_packages`
+    """
+    pkgbuild_paths = [
+        Path(os.path.abspath(folder_path)) / "PKGBUILD" for folder_path in folder_paths
+    ]
+    parsed = parse_packages(pkgbuild_paths, folder)
+
+    packages: list[Package] = []
+    errors: list[PackageException] = []
+    for pkgbuild_path in pkgbuild_paths:
+        try:
+            packages.append(
+                package_from_fields(pkgbuild_path.parent, *parsed[pkgbuild_path])
+            )
+        except PackageException as e:
+            errors.append(e)
+
+    # every invalid package is reported, not only the first one
+    if len(errors) == 1:
+        raise errors[0]
+    if errors:
+        raise PackageException("\n\n".join(map(str, errors)))
+    return packages
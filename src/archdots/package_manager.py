@@ -4,7 +4,7 @@ from typing import Iterable, TypedDict
 from itertools import chain, groupby
 from archdots.exceptions import PackageManagerException, PackageException
 from archdots.package import get_packages, Package
-from archdots.settings import read_config
+from archdots.settings import read_config_view
 from archdots.utils import memoize, SingletonMeta
 from archdots.console import err_console, transient_progress
 from archdots.constants import PACKAGES_FOLDER
@@ -222,7 +222,7 @@ class Custom(PackageManager):
     def uninstall(self, packages: list[str] | list[Package]) -> bool:
         if not packages:
             return True
-        config = read_config()
+        config_view = read_config_view()
 
         all_packages = self.get_packages()
         filtered_packages = self._filter_custom_packages(packages, all_packages)
@@ -237,9 +237,7 @@ class Custom(PackageManager):
             # do not uninstall dependencies that are marked as managed
             if (
                 package not in filtered_packages
-                and "pkgs" in config
-                and self.name in config["pkgs"]
-                and package.name in config["pkgs"][self.name]
+                and package.name in config_view.packages_of(self.name)
                 or not package.check(True)
             ):
                 continue
@@ -255,8 +253,8 @@ class Custom(PackageManager):
                 )
             )
             # do not uninstall dependencies that are marked as managed
-            if "pkgs" in config and pm.name in config["pkgs"]:
-                pm_managed_pkgs = config["pkgs"][pm.name]
+            if pm.name in config_view.packages:
+                pm_managed_pkgs = config_view.packages_of(pm.name)
 
                 deps = list(set(deps).difference(pm_managed_pkgs))
 
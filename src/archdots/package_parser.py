@@ -1,36 +1,51 @@
+import os
+import threading
+from pathlib import Path
 from typing import NamedTuple
+
 from lark import Lark, Transformer
 
-parser = Lark(
-    r"""
-        start: _NL? (item|function|_NL)+
+from archdots.constants import CACHE_FOLDER
 
-        ?value: string
-            | array
+# the analysis of the grammar is serialized here by lark and reused while the grammar and lark version are the same
+PARSER_CACHE = Path(CACHE_FOLDER) / "package_parser.lark"
 
-        item: NAME "=" value? (_NL|)
+GRAMMAR = r"""
+    start: _NL* (_statement _NL*)*
 
-        NAME: /\w/+
+    _statement: item
+        | function
 
-        string: ESCAPED_STRING
-        array: "(" string* ")"
+    ?value: string
+        | array
 
-        function: NAME "(" ")" "{" content "}" _NL?
-        content: (TEXT | "{" content "}")*
-        TEXT: /[^{}]+/
+    item: NAME "=" value?
 
-        _STRING_INNER: /.*?/
-        _STRING_ESC_INNER: _STRING_INNER /(?<!\\)(\\\\)*?/
+    NAME: /\w/+
 
-        ESCAPED_STRING : ("\"" _STRING_ESC_INNER "\"") | ("'" _STRING_ESC_INNER "'")
+    string: ESCAPED_STRING
+    array: "(" string* ")"
 
-        %import common.NEWLINE -> _NL
-        %import common.WS_INLINE
-        %import common.SH_COMMENT
-        %ignore WS_INLINE 
-        %ignore SH_COMMENT
-    """
-)
+    function: NAME "(" ")" "{" content "}"
+    content: (TEXT | "{" content "}")*
+    // only expected inside function bodies, where it takes precedence over the ignored terminals.
+    // blanks right before a brace are left to WS_INLINE
+    TEXT.2: /(?![ \t]*[{}])[^{}]+/
+
+    _STRING_INNER: /.*?/
+    _STRING_ESC_INNER: _STRING_INNER /(?<!\\)(\\\\)*?/
+
+    ESCAPED_STRING : ("\"" _STRING_ESC_INNER "\"") | ("'" _STRING_ESC_INNER "'")
+
+    %import common.NEWLINE -> _NL
+    %import common.WS_INLINE
+    %import common.SH_COMMENT
+    %ignore WS_INLINE
+    %ignore SH_COMMENT
+"""
+
+_parser = None
+_parser_lock = threading.Lock()
 
 
 class Item(NamedTuple):
@@ -43,6 +58,22 @@ class Function(NamedTuple):
     content: str
 
 
+def get_parser():
+    """
+    returns the LALR parser of PKGBUILDs, built on first use.
+    lark stores the analysis of the grammar in PARSER_CACHE, so later processes load it instead
+    """
+    global _parser
+    # PKGBUILDs may be parsed by several threads, see package.parse_packages_concurrently
+    with _parser_lock:
+        if _parser is None:
+            os.makedirs(CACHE_FOLDER, exist_ok=True)
+            _parser = Lark(
+                GRAMMAR, parser="lalr", lexer="contextual", cache=str(PARSER_CACHE)
+            )
+    return _parser
+
+
 class PackageTransformer(Transformer):
     def function(self, items):
         name, content = items
@@ -67,3 +98,36 @@ class PackageTransformer(Transformer):
 
     def start(self, items):
         return items
+
+
+# PKGBUILD path -> (mtime in ns, size, parsed items)
+_parsed_pkgbuilds: dict[str, tuple[int, int, list[Item | Function]]] = {}
+
+
+def parse_pkgbuild(pkgbuild_path: str | Path) -> list[Item | Function]:
+    """
+    returns the fields and functions of a PKGBUILD, in order.
+    the result is kept while the mtime and size of the PKGBUILD are the same
+    """
+    key = os.path.abspath(pkgbuild_path)
+    stat = os.stat(key)
+    cached = _parsed_pkgbuilds.get(key)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(key, "r") as f:
+        text = f.read()
+    items = PackageTransformer().transform(get_parser().parse(text))
+    _parsed_pkgbuilds[key] = (stat.st_mtime_ns, stat.st_size, items)
+    return items
+
+
+def find_function(pkgbuild_path: str | Path, name: str) -> Function | None:
+    return next(
+        (
+            item
+            for item in parse_pkgbuild(pkgbuild_path)
+            if isinstance(item, Function) and item.name == name
+        ),
+        None,
+    )
@@ -1,18 +1,14 @@
 from archdots.package_manager import PackageManager, package_managers
-from archdots.settings import read_config
+from archdots.settings import read_config_view
 
 
 def get_unmanaged_packages(use_memo=True) -> dict[PackageManager, list[str]]:
-    config = read_config()
+    config_view = read_config_view()
     installed_pkgs_by_pm = {pm: pm.get_installed(use_memo) for pm in package_managers}
-    if 'pkgs' not in config:
-        config['pkgs'] = {}
 
     unmanaged_packages: dict[PackageManager, list[str]] = {}
     for pm in installed_pkgs_by_pm:
-        if pm.name not in config["pkgs"]:
-            config["pkgs"][pm.name] = []
-        pkgs = list(set(installed_pkgs_by_pm[pm]) - set(config["pkgs"][pm.name]))
+        pkgs = list(set(installed_pkgs_by_pm[pm]) - config_view.packages_of(pm.name))
 
         unmanaged_packages[pm] = pkgs
 
@@ -20,34 +16,33 @@ def get_unmanaged_packages(use_memo=True) -> dict[PackageManager, list[str]]:
 
 
 def get_managed_packages(use_memo=True) -> dict[PackageManager, list[str]]:
-    config = read_config()
-    if 'pkgs' not in config:
+    config_view = read_config_view()
+    if not config_view.has_pkgs:
         return {}
     installed_pkgs_by_pm = {pm: pm.get_installed(use_memo) for pm in package_managers}
 
     installed_packages: dict[PackageManager, list[str]] = {}
     for pm in installed_pkgs_by_pm:
-        if pm.name not in config["pkgs"]:
+        if pm.name not in config_view.packages:
             continue
+        managed = config_view.packages[pm.name]
         installed_packages[pm] = [
-            pkg_name
-            for pkg_name in installed_pkgs_by_pm[pm]
-            if pkg_name in config["pkgs"][pm.name]
+            pkg_name for pkg_name in installed_pkgs_by_pm[pm] if pkg_name in managed
         ]
     return installed_packages
 
 
 def get_pending_packages(use_memo=True) -> dict[PackageManager, list[str]]:
-    config = read_config()
-    if "pkgs" not in config:
+    config_view = read_config_view()
+    if not config_view.has_pkgs:
         return {}
     installed_pkgs_by_pm = {pm: pm.get_installed(use_memo) for pm in package_managers}
 
     pending_packages: dict[PackageManager, list[str]] = {}
     for pm in installed_pkgs_by_pm:
-        if pm.name not in config["pkgs"]:
+        if pm.name not in config_view.packages:
             continue
-        pkgs = list(set(config["pkgs"][pm.name]) - set(installed_pkgs_by_pm[pm]))
+        pkgs = list(config_view.packages[pm.name] - set(installed_pkgs_by_pm[pm]))
 
         pending_packages[pm] = pkgs
 
@@ -0,0 +1,105 @@
+PACKAGE_TEMPLATE = """
+description={description}
+url={url}
+depends=({depends})
+source=({source})
+# source_on_check=false
+# make this package platform specific. Supported platforms: linux, windows
+platform={platform}
+
+# All items of source will be downloaded and extracted (when necessary)
+# all downloaded (or extracted folders) are stored inside ${{sourced[@]}}
+# This script runs inside a folder over ~/.cache/archdots/pkgname, where all sources are downloaded
+#
+# $PKGPATH has the path to folder containing this file
+
+# This function install the package on the system
+install() {{
+    echo "message from install() of {name}"
+}}
+
+# This function uninstall the package from the system
+uninstall() {{
+    echo "message from uninstall() of {name}"
+}}
+
+# This function should end with exit code 0 when the package is installed on system
+# and end with exit code 1 when it is uninstalled
+check() {{
+    echo "message from check() of {name}"
+}}
+"""
+
+HEALTH_TEMPLATE = """
+description={description}
+url=''
+depends=({depends})
+source=()
+# source_on_check=false
+# make this health script platform specific. Supported platforms: linux, windows
+platform={platform}
+
+# All items of source will be downloaded and extracted (when necessary)
+# all downloaded (or extracted folders) are stored inside ${{sourced[@]}}
+# This script is ran inside a folder over ~/.cache/archdots/pkgname, where all sources are downloaded
+#
+# $PKGPATH has the path to folder containing this file
+
+# This function is used to configure the health script
+install() {{
+    echo "message from install() of {name}"
+}}
+
+# This function is used to unconfigure the health script
+uninstall() {{
+    echo "message from uninstall() of {name}"
+}}
+
+# This function should end with exit code 0 when the health script is configured
+# and end with exit code 1 when it is unconfigured
+check() {{
+    echo "message from check() of {name}"
+}}
+"""
+
+
+def quote(value: str) -> str:
+    """
+    single quoted bash string of `value`
+    """
+    return "'" + value.replace("'", "'\"'\"'") + "'"
+
+
+def package_pkgbuild(
+    name: str,
+    description: str,
+    url: str,
+    depends: list[str],
+    source: list[str],
+    platform: str,
+) -> str:
+    """
+    PKGBUILD written by `dots pkg new`
+    """
+    return PACKAGE_TEMPLATE.format(
+        name=name,
+        description=quote(description),
+        url=quote(url),
+        depends=" ".join(map(quote, depends)),
+        source=" ".join(map(quote, source)),
+        platform=quote(platform),
+    ).strip()
+
+
+def health_pkgbuild(
+    name: str, description: str, depends: list[str], platform: str
+) -> str:
+    """
+    PKGBUILD written by `dots health new`
+    """
+    return HEALTH_TEMPLATE.format(
+        name=name,
+        description=quote(description),
+        depends=" ".join(map(quote, depends)),
+        platform=quote(platform),
+    ).strip()
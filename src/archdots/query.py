@@ -0,0 +1,343 @@
+import re
+import json
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from archdots.exceptions import QueryException
+
+# a compiled filter maps its input to zero or more outputs, like jq
+Filter = Callable[[Any], Iterator[Any]]
+
+TOKEN_REGEX = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<field>\.[A-Za-z_][\w-]*)
+      | (?P<op>==|!=|<=|>=|[.\[\]|(),?<>])
+      | (?P<name>[A-Za-z_]\w*)
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+def tokenize(query: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = TOKEN_REGEX.match(query, position)
+        if not match or match.end() == position:
+            raise QueryException(
+                f"invalid query at position {position}: {query[position:]!r}"
+            )
+        kind = match.lastgroup or ""
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def type_name(value: Any) -> str:
+    match value:
+        case None:
+            return "null"
+        case bool():
+            return "boolean"
+        case int() | float():
+            return "number"
+        case str():
+            return "string"
+        case list():
+            return "array"
+        case dict():
+            return "object"
+    return type(value).__name__
+
+
+def is_truthy(value: Any) -> bool:
+    return value is not None and value is not False
+
+
+def index_value(value: Any, index: Any) -> Any:
+    """
+    `.[index]` of jq. missing keys and out of range indexes are null
+    """
+    if value is None:
+        return None
+    if isinstance(value, dict) and isinstance(index, str):
+        return value.get(index)
+    if (
+        isinstance(value, list)
+        and isinstance(index, (int, float))
+        and not isinstance(index, bool)
+    ):
+        index = int(index)
+        return value[index] if -len(value) <= index < len(value) else None
+    raise QueryException(
+        f"cannot index {type_name(value)} with {type_name(index)} {json.dumps(index)}"
+    )
+
+
+def iterate_value(value: Any) -> Iterator[Any]:
+    """
+    `.[]` of jq
+    """
+    if isinstance(value, dict):
+        yield from value.values()
+    elif isinstance(value, list):
+        yield from value
+    else:
+        raise QueryException(f"cannot iterate over {type_name(value)}")
+
+
+def keys_of(value: Any) -> list[Any]:
+    if isinstance(value, dict):
+        return sorted(value.keys(), key=str)
+    if isinstance(value, list):
+        return list(range(len(value)))
+    raise QueryException(f"{type_name(value)} has no keys")
+
+
+def length_of(value: Any) -> Any:
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        raise QueryException("boolean has no length")
+    if isinstance(value, (int, float)):
+        return abs(value)
+    if isinstance(value, (str, list, dict)):
+        return len(value)
+    raise QueryException(f"{type_name(value)} has no length")
+
+
+def compare(op: str, left: Any, right: Any) -> bool:
+    if op == "==":
+        return left == right
+    if op == "!=":
+        return left != right
+    try:
+        match op:
+            case "<":
+                return left < right
+            case "<=":
+                return left <= right
+            case ">":
+                return left > right
+            case _:
+                return left >= right
+    except TypeError:
+        raise QueryException(f"cannot compare {type_name(left)} and {type_name(right)}")
+
+
+class QueryParser:
+    """
+    recursive descent parser for a subset of jq:
+    `.`, `.foo`, `."foo"`, `.[0]`, `.["foo"]`, `.[]`, `?`, `|`, `,`, `keys`, `length`, `select(f)`, `not`,
+    comparisons, `and`/`or`, parentheses and json literals
+    """
+
+    def __init__(self, query: str) -> None:
+        self.tokens = tokenize(query)
+        self.position = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def next(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise QueryException("unexpected end of query")
+        self.position += 1
+        return token
+
+    def accept(self, value: str) -> bool:
+        if (token := self.peek()) and token[1] == value and token[0] in ("op", "name"):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, value: str):
+        if not self.accept(value):
+            token = self.peek()
+            found = token[1] if token else "end of query"
+            raise QueryException(f'expected "{value}" but found "{found}"')
+
+    def parse(self) -> Filter:
+        query_filter = self.parse_pipe()
+        if (token := self.peek()) is not None:
+            raise QueryException(f'unexpected "{token[1]}"')
+        return query_filter
+
+    def parse_pipe(self) -> Filter:
+        query_filter = self.parse_comma()
+        while self.accept("|"):
+            query_filter = self.chain(query_filter, self.parse_comma())
+        return query_filter
+
+    def parse_comma(self) -> Filter:
+        filters = [self.parse_or()]
+        while self.accept(","):
+            filters.append(self.parse_or())
+        if len(filters) == 1:
+            return filters[0]
+        return lambda value: (output for f in filters for output in f(value))
+
+    def parse_or(self) -> Filter:
+        query_filter = self.parse_and()
+        while self.accept("or"):
+            query_filter = self.boolean(query_filter, self.parse_and(), "or")
+        return query_filter
+
+    def parse_and(self) -> Filter:
+        query_filter = self.parse_compare()
+        while self.accept("and"):
+            query_filter = self.boolean(query_filter, self.parse_compare(), "and")
+        return query_filter
+
+    def parse_compare(self) -> Filter:
+        left = self.parse_postfix()
+        token = self.peek()
+        if token and token[1] in ("==", "!=", "<", "<=", ">", ">="):
+            self.position += 1
+            op = token[1]
+            right = self.parse_postfix()
+            return lambda value: (
+                compare(op, l, r) for r in right(value) for l in left(value)
+            )
+        return left
+
+    def parse_postfix(self) -> Filter:
+        query_filter = self.parse_primary()
+        while True:
+            token = self.peek()
+            if token is None:
+                return query_filter
+            kind, text = token
+            if kind == "field":
+                self.position += 1
+                query_filter = self.chain(query_filter, self.field(text[1:]))
+            elif text == "." and self.is_string_next(1):
+                self.position += 1
+                query_filter = self.chain(query_filter, self.field(self.string()))
+            elif text == "[" or (text == "." and self.is_bracket_next(1)):
+                if text == ".":
+                    self.position += 1
+                query_filter = self.chain(query_filter, self.brackets())
+            elif text == "?" and kind == "op":
+                self.position += 1
+                query_filter = self.optional(query_filter)
+            else:
+                return query_filter
+
+    def parse_primary(self) -> Filter:
+        kind, text = self.next()
+
+        if kind == "field":
+            return self.field(text[1:])
+        if kind == "number":
+            number = float(text) if "." in text else int(text)
+            return lambda value: iter([number])
+        if kind == "string":
+            string = json.loads(text)
+            return lambda value: iter([string])
+
+        if text == ".":
+            if self.is_string_next():
+                return self.field(self.string())
+            if self.is_bracket_next():
+                return self.brackets()
+            return lambda value: iter([value])
+        if text == "(":
+            query_filter = self.parse_pipe()
+            self.expect(")")
+            return query_filter
+
+        match text:
+            case "keys":
+                return lambda value: iter([keys_of(value)])
+            case "length":
+                return lambda value: iter([length_of(value)])
+            case "not":
+                return lambda value: iter([not is_truthy(value)])
+            case "empty":
+                return lambda value: iter([])
+            case "true" | "false" | "null":
+                literal = json.loads(text)
+                return lambda value: iter([literal])
+            case "select":
+                self.expect("(")
+                condition = self.parse_pipe()
+                self.expect(")")
+                return lambda value: (
+                    value for result in condition(value) if is_truthy(result)
+                )
+
+        raise QueryException(f'unknown function or token "{text}"')
+
+    def is_string_next(self, offset=0) -> bool:
+        position = self.position + offset
+        return position < len(self.tokens) and self.tokens[position][0] == "string"
+
+    def is_bracket_next(self, offset=0) -> bool:
+        position = self.position + offset
+        return position < len(self.tokens) and self.tokens[position][1] == "["
+
+    def string(self) -> str:
+        return json.loads(self.next()[1])
+
+    def brackets(self) -> Filter:
+        self.expect("[")
+        if self.accept("]"):
+            return iterate_value
+        index = self.parse_pipe()
+        self.expect("]")
+        return lambda value: (index_value(value, i) for i in index(value))
+
+    @staticmethod
+    def field(name: str) -> Filter:
+        return lambda value: iter([index_value(value, name)])
+
+    @staticmethod
+    def chain(left: Filter, right: Filter) -> Filter:
+        return lambda value: (
+            output for middle in left(value) for output in right(middle)
+        )
+
+    @staticmethod
+    def boolean(left: Filter, right: Filter, op: str) -> Filter:
+        # the right side only runs when the left one does not decide the result
+        def run(value: Any) -> Iterator[Any]:
+            for left_value in left(value):
+                if is_truthy(left_value) == (op == "or"):
+                    yield op == "or"
+                else:
+                    yield from (is_truthy(r) for r in right(value))
+
+        return run
+
+    @staticmethod
+    def optional(query_filter: Filter) -> Filter:
+        def run(value: Any) -> Iterator[Any]:
+            try:
+                yield from list(query_filter(value))
+            except QueryException:
+                pass
+
+        return run
+
+
+def compile_query(query: str) -> Filter:
+    """
+    compile a jq filter, raising QueryException when it is invalid or not supported
+    """
+    return QueryParser(query).parse()
+
+
+def run_query(query: str, data: Any) -> list[Any]:
+    """
+    returns every output of the jq filter `query` applied to `data`
+    """
+    return list(compile_query(query)(data))
@@ -34,7 +34,13 @@ class CommandTreeNode:
     name: str
     subcommands: list[Self]
     path: Path
-    mtime: float
+
+    @property
+    def mtime(self) -> float:
+        """
+        modification time of the command file, stated when read. 0 for folders without a metadata file
+        """
+        return self.path.stat().st_mtime if self.path.is_file() else 0
 
 
 @dataclass
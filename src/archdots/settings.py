@@ -1,42 +1,140 @@
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 import os
+import threading
 from pathlib import Path
-import yaml
 from typing import Any
+from dataclasses import dataclass
 
+from archdots.cache import SourceStat, dump_snapshot, load_snapshot, source_stat
 from archdots.constants import CACHE_FOLDER, CONFIG_FOLDER, MODULE_PATH
-from archdots.console import warn_console
 from archdots.exceptions import SettingsException
+from archdots import yaml_io
 
-CONFIG_CACHE = Path(CACHE_FOLDER) / "config.yaml.cache"
+CONFIG_CACHE = Path(CACHE_FOLDER) / "config.cache"
+CONFIG_CACHE_VERSION = 6
+
+# config file -> files it imports
+ImportGraph = dict[str, list[str]]
+# import files parsed at the same time
+IMPORT_WORKERS = 8
+# key path -> file the value comes from. list items are keyed by their index in the merged list
+Provenance = dict[tuple[Any, ...], str]
+# config file -> key path of the merged config its config is merged at
+Mounts = dict[str, tuple[Any, ...]]
 
 _config_memo: dict[Any, Any] = {}
 _last_mtime = 0
 
 
-def iterdict_merge(
-    d: dict[Any, Any], callback: Callable[[Any, Any], Any]
-) -> dict[Any, Any]:
+@dataclass(frozen=True)
+class ConfigView:
     """
-    auxiliary function. call a callback for each key/value inside dict and merge the result
+    merged config indexed for fast lookups. `packages` are the packages of each package manager in `config["pkgs"]`,
+    taken when the view was built
     """
-    from deepmerge import always_merger
 
-    d_copy = d.copy()
-    for k, v in d.items():
-        if isinstance(v, dict):
-            d_copy[k] = iterdict_merge(v, callback)
-        elif (result := callback(k, v)) != None:
-            always_merger.merge(d_copy, iterdict_merge(result, callback))
-            # d_copy = {**d, **iterdict_merge(result, callback)}
-            del d_copy[k]
-    return d_copy
+    config: dict[Any, Any]
+    packages: Mapping[str, frozenset[str]]
+
+    @staticmethod
+    def build(config: dict[Any, Any]) -> "ConfigView":
+        pkgs = config.get("pkgs")
+        if not isinstance(pkgs, dict):
+            pkgs = {}
+        return ConfigView(
+            config=config,
+            packages={
+                pm_name: (
+                    frozenset(map(str, pkg_names))
+                    if isinstance(pkg_names, list)
+                    else frozenset()
+                )
+                for pm_name, pkg_names in pkgs.items()
+            },
+        )
+
+    @property
+    def has_pkgs(self) -> bool:
+        return "pkgs" in self.config
+
+    def packages_of(self, pm_name: str) -> frozenset[str]:
+        """
+        packages configured for `pm_name`. empty if it has no entry
+        """
+        return self.packages.get(pm_name, frozenset())
 
 
-def iter_imports(imports_any: Any, recursive=False):
+_config_view: ConfigView | None = None
+
+# directory or glob import -> files it matched and the stats of the folders listed to match them
+ImportExpansion = tuple[list[Path], list[SourceStat]]
+# filled by the threads of `load_import_tree` under the lock. it is only cleared or read whole while no import is loaded
+_import_expansions: dict[Path, ImportExpansion] = {}
+_import_expansions_lock = threading.Lock()
+
+IMPORT_EXTENSIONS = (".yaml", ".yml")
+
+
+def glob_folders(pattern: str) -> list[str]:
     """
-    Returns an Generator for all imported files inside a given config
+    returns the folders listed by `glob` to expand `pattern`
     """
+    import glob
+
+    parent = os.path.dirname(pattern)
+    if not glob.has_magic(parent):
+        if not os.path.isdir(parent):
+            raise SettingsException(f'Invalid import. "{parent}" is not a directory')
+        return [parent]
+    return [
+        *glob_folders(parent),
+        *sorted(p for p in glob.glob(parent, recursive=True) if os.path.isdir(p)),
+    ]
+
+
+def expand_import(import_path: Path) -> ImportExpansion:
+    """
+    returns the config files of the directory or glob pattern `import_path`, sorted by path.
+    the expansion is kept until `clear_config_memo` and the folders are stated before being listed,
+    so a fragment added or removed meanwhile changes their stats
+    """
+    with _import_expansions_lock:
+        if import_path not in _import_expansions:
+            _import_expansions[import_path] = list_import(import_path)
+        return _import_expansions[import_path]
+
+
+def list_import(import_path: Path) -> ImportExpansion:
+    """
+    lists the config files of the directory or glob pattern `import_path`, without caching them
+    """
+    import glob
+
+    if os.path.isdir(import_path):
+        stats = [source_stat(import_path)]
+        files = [
+            p
+            for p in import_path.iterdir()
+            if p.suffix in IMPORT_EXTENSIONS and p.is_file()
+        ]
+    else:
+        stats = [source_stat(p) for p in glob_folders(str(import_path))]
+        files = [
+            Path(p)
+            for p in glob.glob(str(import_path), recursive=True)
+            if os.path.isfile(p)
+        ]
+
+    return (sorted({p.resolve() for p in files}), stats)
+
+
+def iter_imports(imports_any: Any):
+    """
+    Returns an Generator for all imported files inside a given config.
+    imports can be files, directories, whose yaml files are imported, or glob patterns
+    """
+    import glob
+
     custom_folder = Path(CONFIG_FOLDER)
 
     if isinstance(imports_any, str):
@@ -58,49 +156,373 @@ def iter_imports(imports_any: Any, recursive=False):
         else:
             import_path = Path(imp).resolve()
 
-        if not os.path.isfile(import_path):
+        if os.path.isdir(import_path) or glob.has_magic(imp):
+            yield from expand_import(import_path)[0]
+        elif not os.path.isfile(import_path):
             raise SettingsException(f'Invalid import. "{import_path}" is not a file')
+        else:
+            yield import_path
 
-        if recursive:
-            with open(import_path, "r") as f:
-                imported_config = yaml.safe_load(f)
-                if "import" in imported_config:
-                    yield from (Path(p) for p in imported_config["import"])
 
-        yield import_path
+def find_import_mounts(config: Any, path: tuple[Any, ...] = ()):
+    """
+    Returns an Generator for the files imported anywhere inside a given config, with the key path they are merged at
+    """
+    if not isinstance(config, dict):
+        return
+    for k, v in config.items():
+        if k == "import":
+            yield from ((path, import_path) for import_path in iter_imports(v))
+        elif isinstance(v, dict):
+            yield from find_import_mounts(v, (*path, k))
 
 
-def compare_mtime_with_imports(config: dict[str, Any], mtime: float) -> bool:
+def find_imports(config: Any):
     """
-    returns `True` if there is a config file that modification time is more recent than `mtime`
+    Returns an Generator for the files imported anywhere inside a given config, the same ones `read_config` merges
+    """
+    return (import_path for _, import_path in find_import_mounts(config))
+
+
+def check_import_cycles(graph: ImportGraph, root: str):
+    """
+    raises SettingsException if a file reachable from `root` ends up importing itself
+    """
+    stack: list[str] = []
+    checked: set[str] = set()
+
+    def visit(path: str):
+        if path in checked:
+            return
+        if path in stack:
+            cycle = [*stack[stack.index(path) :], path]
+            raise SettingsException(f'Import cycle. {" -> ".join(cycle)}')
+        stack.append(path)
+        for import_path in graph.get(path, []):
+            visit(import_path)
+        stack.pop()
+        checked.add(path)
+
+    visit(root)
+
+
+def load_import_tree(
+    config_path: Path, load_yaml: Callable[[Path], Any]
+) -> tuple[dict[Path, Any], ImportGraph]:
+    """
+    parse `config_path` and every file imported by it, recursively, with `load_yaml`.
+    files are deduplicated by their resolved path and each level of imports is parsed concurrently.
+    raises SettingsException on import cycles
+    """
+    contents = {config_path: load_yaml(config_path)}
+    graph: ImportGraph = {}
+
+    pending = [config_path]
+    executor = None
+    try:
+        while pending:
+            next_pending: list[Path] = []
+            for path in pending:
+                import_paths = list(dict.fromkeys(find_imports(contents[path])))
+                graph[str(path)] = [str(p) for p in import_paths]
+                next_pending.extend(
+                    p
+                    for p in import_paths
+                    if p not in contents and p not in next_pending
+                )
+
+            if len(next_pending) > 1 and executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS)
+
+            loaded = (executor.map if executor else map)(load_yaml, next_pending)
+            contents.update(zip(next_pending, loaded))
+            pending = next_pending
+    finally:
+        if executor:
+            executor.shutdown()
+
+    check_import_cycles(graph, str(config_path))
+    return contents, graph
+
+
+def build_import_graph(config_path: Path) -> ImportGraph:
+    """
+    parse `config_path` and every file imported by it, recursively
+    """
+
+    return load_import_tree(config_path, yaml_io.load_file)[1]
+
+
+def config_files() -> list[Path]:
+    """
+    returns config.yaml and every file imported by it, recursively.
+    the import graph stored with the config cache is used while none of its files changed, so usually nothing is parsed
     """
     config_path = Path(CONFIG_FOLDER) / "config.yaml"
-    if "import" not in config:
-        if config_path.lstat().st_mtime > mtime:
-            return True
+    if not config_path.is_file():
+        return []
+
+    cached = load_snapshot(CONFIG_CACHE, CONFIG_CACHE_VERSION)
+    if isinstance(cached, dict):
+        graph: ImportGraph = cached["imports"]
+    else:
+        graph = build_import_graph(config_path)
+
+    files = [config_path]
+    pending = [str(config_path)]
+    while pending:
+        for import_path in graph.get(pending.pop(), []):
+            if Path(import_path) not in files:
+                files.append(Path(import_path))
+                pending.append(import_path)
+
+    return files
+
+
+def config_folders() -> list[Path]:
+    """
+    returns the folders expanded by directory and glob imports. a fragment added or removed changes their mtime
+    """
+    if not (Path(CONFIG_FOLDER) / "config.yaml").is_file():
+        return []
+
+    cached = load_snapshot(CONFIG_CACHE, CONFIG_CACHE_VERSION)
+    if not isinstance(cached, dict):
+        cached = build_config_cache()
+
+    return list(
+        dict.fromkeys(
+            Path(stat[0])
+            for _, folder_stats in cached["expansions"].values()
+            for stat in folder_stats
+        )
+    )
+
+
+def compare_mtime_with_imports(mtime: float) -> bool:
+    """
+    returns `True` if there is a config file that modification time is more recent than `mtime`
+    """
+    return any(
+        path.lstat().st_mtime > mtime for path in [*config_files(), *config_folders()]
+    )
+
+
+def clear_config_memo():
+    """
+    forget the config kept in memory by `read_config`
+    """
+    global _last_mtime
+    global _config_memo
+    global _config_view
+    _config_memo = {}
+    _config_view = None
+    _last_mtime = 0
+    _import_expansions.clear()
+
+
+# where each value of a merged config came from, built along with it.
+# dicts and lists are (file, children), any other value is just its file
+SourceTree = tuple[str, "dict[Any, SourceTree] | list[SourceTree]"] | str
+
+
+def source_tree(value: Any, source: str) -> SourceTree:
+    if isinstance(value, dict):
+        return (source, {k: source_tree(v, source) for k, v in value.items()})
+    if isinstance(value, list):
+        return (source, [source] * len(value))
+    return source
+
+
+def merge_into(
+    base: dict[Any, Any],
+    base_sources: dict[Any, SourceTree],
+    other: dict[Any, Any],
+    other_sources: dict[Any, SourceTree],
+):
+    """
+    merge `other` into `base` like deepmerge's always_merger: dicts are merged, lists are appended and anything else is overridden
+    """
+    for k, v in other.items():
+        current = base.get(k)
+        if isinstance(current, dict) and isinstance(v, dict):
+            merge_into(current, base_sources[k][1], v, other_sources[k][1])  # type: ignore
+        elif isinstance(current, list) and isinstance(v, list):
+            base[k] = current + v
+            owner, items = base_sources[k]  # type: ignore
+            base_sources[k] = (owner, items + other_sources[k][1])  # type: ignore
+        else:
+            base[k] = v
+            base_sources[k] = other_sources[k]
+
+
+def merge_node(
+    node: dict[Any, Any], source: str, load_yaml: Callable[[Path], Any]
+) -> tuple[dict[Any, Any], dict[Any, SourceTree]]:
+    """
+    returns `node` of the file `source` with its imports merged, and where each of its values came from.
+    imported values override the ones of the importer
+    """
+    merged: dict[Any, Any] = {}
+    sources: dict[Any, SourceTree] = {}
+    for k, v in node.items():
+        if k == "import":
+            continue
+        if isinstance(v, dict):
+            merged[k], children = merge_node(v, source, load_yaml)
+            sources[k] = (source, children)
+        else:
+            # files imported more than once are parsed once, their lists must not be shared
+            merged[k] = v.copy() if isinstance(v, list) else v
+            sources[k] = source_tree(v, source)
+
+    if "import" not in node:
+        return merged, sources
+
+    for import_path in iter_imports(node["import"]):
+        imported_config = load_yaml(import_path)
+        if not isinstance(imported_config, dict):
+            raise SettingsException(
+                f'Invalid import. Contents of "{import_path}" is not a valid imported config. All imported files must contain at least one field'
+            )
+        merge_into(
+            merged,
+            sources,
+            *merge_node(imported_config, str(import_path), load_yaml),
+        )
+
+    return merged, sources
 
-        return False
 
-    pending = [*iter_imports(config["import"]), config_path]
+def flatten_sources(
+    sources: SourceTree, provenance: Provenance, path: tuple[Any, ...] = ()
+):
+    if isinstance(sources, str):
+        provenance[path] = sources
+        return
+    owner, children = sources
+    provenance[path] = owner
+    for k, child in (
+        children.items() if isinstance(children, dict) else enumerate(children)
+    ):
+        flatten_sources(child, provenance, (*path, k))
+
 
+def import_mounts(contents: dict[Path, Any], config_path: Path) -> Mounts:
+    """
+    key path each file of `contents` is merged at. a file imported more than once keeps the first one
+    """
+    mounts: Mounts = {str(config_path): ()}
+    pending = [config_path]
     while pending:
-        next_import = pending.pop()
+        path = pending.pop(0)
+        for key_path, import_path in find_import_mounts(contents[path]):
+            if str(import_path) not in mounts:
+                mounts[str(import_path)] = (*mounts[str(path)], *key_path)
+                pending.append(import_path)
+    return mounts
 
-        if next_import.lstat().st_mtime > mtime:
-            return True
 
-        if not next_import.is_file():
-            raise SettingsException("invalid config file")
-        with open(next_import, "r") as f:
-            next_config = yaml.safe_load(f)
+def merge_config(
+    load_yaml: Callable[[Path], Any],
+) -> tuple[dict[Any, Any], Provenance, Mounts]:
+    """
+    merge config.yaml, its imports and the default config. every file is read with `load_yaml`.
+    returns the merged config, the file each of its keys, list items included, came from and the key path each file
+    is merged at
+    """
+    config_path = Path(CONFIG_FOLDER) / "config.yaml"
+    default_path = Path(MODULE_PATH) / "config.default.yaml"
 
-        if "import" in next_config:
-            if isinstance(next_config["import"], str):
-                pending.append(Path(CONFIG_FOLDER) / next_config["import"])
-            else:
-                pending.extend((Path(CONFIG_FOLDER) / p) for p in next_config["import"])
+    contents, _ = load_import_tree(config_path, load_yaml)
 
-    return False
+    user_config = contents[config_path]
+    if not isinstance(user_config, dict):
+        raise SettingsException(
+            f'Invalid config. Contents of "{config_path}" must contain at least one field'
+        )
+    config, sources = merge_node(user_config, str(config_path), contents.__getitem__)
+
+    default_config = load_yaml(default_path)
+    default_sources = source_tree(default_config, str(default_path))[1]
+
+    provenance: Provenance = {}
+    flatten_sources(
+        (str(config_path), {**default_sources, **sources}),  # type: ignore
+        provenance,
+    )
+    return (
+        {**default_config, **config},
+        provenance,
+        import_mounts(contents, config_path),
+    )
+
+
+def snapshot_loader(
+    sources: dict[Path, SourceStat],
+    imports: ImportGraph,
+    contents: dict[Path, Any] | None = None,
+) -> Callable[[Path], Any]:
+    """
+    returns a `load_yaml` for `merge_config` that records the sources and import graph stored with the config cache.
+    files in `contents` are taken from memory, their sources must be recorded by the caller
+    """
+
+    def load_yaml(path: Path) -> Any:
+        if contents is not None and path in contents:
+            import copy
+
+            # merging changes the loaded configs
+            content = copy.deepcopy(contents[path])
+        else:
+            # stat before reading, so a file changed meanwhile invalidates the cache
+            sources[path] = source_stat(path)
+            content = yaml_io.load_file(path)
+        imports[str(path)] = [str(p) for p in find_imports(content)]
+        return content
+
+    return load_yaml
+
+
+def build_config_cache(
+    sources: dict[Path, SourceStat] | None = None,
+    contents: dict[Path, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    merge the config and store it with its import graph and provenance, which let `config_files` and `save_config` find
+    the config files without parsing them. the stats of its sources are stored as well, so `save_config` can replace the
+    ones of the files it writes. `sources` and `contents` are passed to `snapshot_loader`
+    """
+    global _last_mtime
+    global _config_memo
+
+    # every file the merged config is built from, checked before the cache is used
+    sources = {} if sources is None else sources
+    imports: ImportGraph = {}
+
+    # folders are stated again, a fragment may have been added since they were listed
+    _import_expansions.clear()
+    config, provenance, mounts = merge_config(
+        snapshot_loader(sources, imports, contents)
+    )
+    for _, folder_stats in _import_expansions.values():
+        sources.update((Path(stat[0]), stat) for stat in folder_stats)
+    cached = {
+        "config": config,
+        "imports": imports,
+        "provenance": provenance,
+        "mounts": mounts,
+        "expansions": dict(_import_expansions),
+        "sources": list(sources.values()),
+    }
+
+    _config_memo = config
+    _last_mtime = (Path(CONFIG_FOLDER) / "config.yaml").lstat().st_mtime
+
+    dump_snapshot(CONFIG_CACHE, CONFIG_CACHE_VERSION, list(sources.values()), cached)
+    return cached
 
 
 def read_config(use_memo=True) -> dict[Any, Any]:
@@ -114,27 +536,8 @@ def read_config(use_memo=True) -> dict[Any, Any]:
     custom_folder = Path(CONFIG_FOLDER)
     config_path = custom_folder / "config.yaml"
 
-    def handle_imports(key: Any, value: Any):
-        if key != "import":
-            return
-
-        from deepmerge import always_merger
-
-        merged_value = {}
-        for import_path in iter_imports(value):
-            with open(import_path, "r") as f:
-                imported_config = yaml.safe_load(f)
-                if not isinstance(imported_config, dict):
-                    raise SettingsException(
-                        f'Invalid import. Contents of "{import_path}" is not a valid imported config. All imported files must contain at least one field'
-                    )
-            always_merger.merge(merged_value, imported_config)
-            # merged_value = {**merged_value, **imported_config}
-
-        return merged_value
-
     if not os.path.isfile(config_path):
-        os.makedirs(custom_folder)
+        os.makedirs(custom_folder, exist_ok=True)
         with open(module_path / "config.default.yaml", "r") as f:
             default_config = f.read()
         with open(config_path, "w") as f:
@@ -142,32 +545,26 @@ def read_config(use_memo=True) -> dict[Any, Any]:
     elif use_memo and _config_memo and config_path.lstat().st_mtime == _last_mtime:
         return _config_memo
 
-    with open(config_path, "r") as f:
-        config = yaml.safe_load(f)
-
-    if CONFIG_CACHE.is_file() and (
-        use_memo
-        and not compare_mtime_with_imports(config, CONFIG_CACHE.lstat().st_mtime)
+    if use_memo and isinstance(
+        cached := load_snapshot(CONFIG_CACHE, CONFIG_CACHE_VERSION), dict
     ):
-        with open(CONFIG_CACHE, "r") as f:
-            cached_config = yaml.safe_load(f)
-            if not isinstance(cached_config, dict):
-                warn_console.print("warning: invalid cached config.")
-            else:
-                return cached_config
-
-    config = iterdict_merge(config, handle_imports)
+        _config_memo = cached["config"]
+        _last_mtime = config_path.lstat().st_mtime
+        return _config_memo
 
-    with open(module_path / "config.default.yaml", "r") as f:
-        default_config = yaml.safe_load(f)
+    return build_config_cache()["config"]
 
-    _config_memo = {**default_config, **config}
-    _last_mtime = config_path.lstat().st_mtime
 
-    with open(CONFIG_CACHE, "w") as f:
-        yaml.safe_dump(_config_memo, f)
-
-    return _config_memo
+def read_config_view(use_memo=True) -> ConfigView:
+    """
+    same as `read_config`, but returns the config indexed by a `ConfigView`.
+    the view is built once for each config returned by `read_config`
+    """
+    global _config_view
+    config = read_config(use_memo)
+    if _config_view is None or _config_view.config is not config:
+        _config_view = ConfigView.build(config)
+    return _config_view
 
 
 def freeze(d: Any):
@@ -196,104 +593,327 @@ def unfreeze(d: frozenset):
     return list(unfreeze(v) for v in d)
 
 
-def iterdict_imports(
-    config: dict[Any, Any],
-    merged_config: dict[Any, Any],
-    new_merged_config: dict[Any, Any],
-    config_path=Path(CONFIG_FOLDER) / "config.yaml",
-) -> dict[Any, Any]:
+def reconcile_list(
+    current: list[Any], merged: Any, new_merged: list[Any]
+) -> tuple[list[Any], list[Any]]:
     """
-    Traverse a config imports and write changes on correct files
+    apply the changes between `merged` and `new_merged` to the list `current` of a single config file.
+    items of `current` still present in `new_merged` keep their order (duplicates included) and items missing from `merged` are appended.
+    returns the new list and the items of `new_merged` left for the other config files
     """
+    # frozen item -> item, in the order of new_merged
+    pending = {freeze(item): item for item in new_merged}
+    merged_keys = (
+        {freeze(item) for item in merged} if isinstance(merged, list) else set()
+    )
+
+    result = []
+    kept_keys = set()
+    for item in current:
+        key = freeze(item)
+        if key in kept_keys:
+            result.append(item)
+        elif key in pending:
+            del pending[key]
+            kept_keys.add(key)
+            result.append(item)
+
+    left = []
+    for key, item in pending.items():
+        if key in merged_keys:
+            left.append(item)
+        else:
+            result.append(item)
 
-    all_configs = [config]
-    all_config_paths = [config_path]
-    if "import" in config:
-        from itertools import chain
-
-        all_config_paths = list(
-            sorted(
-                chain(all_config_paths, iter_imports(config["import"])),
-                key=lambda p: p.lstat().st_mtime,
-                reverse=True,
-            )
-        )
-        all_configs = list(
-            map(
-                lambda p: yaml.safe_load(p.read_text()),
-                all_config_paths,
-            )
-        )
-
-    for k, v in new_merged_config.items():
-        if k in merged_config:
-            continue
-        config[k] = v
+    return result, left
 
-    for current_config, current_config_path in zip(all_configs, all_config_paths):
-        if not isinstance(current_config, dict):
-            raise SettingsException(
-                f'Invalid import. Contents of "{current_config_path}" is not a valid imported config. All imported files must contain at least one field'
-            )
 
-        for k, v in current_config.copy().items():
-            if k == "import":
-                continue
-            elif k not in new_merged_config:
-                del current_config[k]
-            elif isinstance(v, dict):
-                if not isinstance(new_merged_config[k], dict):
-                    current_config[k] = new_merged_config[k]
-                    continue
-                if k not in merged_config:
-                    continue
-                current_config[k] = iterdict_imports(
-                    v,
-                    merged_config[k],
-                    new_merged_config[k],
-                    current_config_path,
-                )
-            elif isinstance(v, list):
-                if not isinstance(new_merged_config[k], list):
-                    current_config[k] = new_merged_config[k]
-                    continue
-
-                new_merged_items = freeze(new_merged_config[k])
+def changed_paths(old: Any, new: Any, path: tuple[Any, ...] = ()):
+    """
+    yields the key paths whose values differ between `old` and `new`
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        if old != new:
+            yield path
+        return
+    for k in old.keys() | new.keys():
+        if k in old and k in new:
+            yield from changed_paths(old[k], new[k], (*path, k))
+        else:
+            yield (*path, k)
 
-                keeped_items = frozenset(freeze(v)).intersection(new_merged_items)
 
-                if k in merged_config:
-                    new_items = new_merged_items.difference(freeze(merged_config[k]))
-                else:
-                    new_items = new_merged_items
+def get_in(config: Any, path: tuple[Any, ...]) -> Any:
+    """
+    value at the key path `path` of `config`. None if it has no such key
+    """
+    for k in path:
+        if not isinstance(config, dict) or k not in config:
+            return None
+        config = config[k]
+    return config
 
-                current_config[k] = [*unfreeze(keeped_items), *unfreeze(new_items)]
 
-                new_merged_config[k] = unfreeze(
-                    new_merged_items - keeped_items - new_items
-                )
-            else:
-                current_config[k] = new_merged_config[k]
+def set_in(config: dict[Any, Any], path: tuple[Any, ...], value: Any):
+    """
+    set the key path `path` of `config` to `value`, adding the dicts missing on the way
+    """
+    *parents, last = path
+    for k in parents:
+        if not isinstance(config.get(k), dict):
+            config[k] = {}
+        config = config[k]
+    config[last] = value
 
-        with open(current_config_path, "w") as f:
-            yaml.dump(current_config, f)
 
-    return config
+def delete_in(config: dict[Any, Any], path: tuple[Any, ...]):
+    """
+    remove the key path `path` of `config`. an empty `path` removes every key
+    """
+    if not path:
+        config.clear()
+        return
+    parent = get_in(config, path[:-1])
+    if isinstance(parent, dict):
+        parent.pop(path[-1], None)
+
+
+def split_list(
+    path: tuple[Any, ...],
+    merged: list[Any],
+    new_merged: list[Any],
+    owner: str,
+    provenance: Provenance,
+) -> dict[str, tuple[list[Any], list[Any]]]:
+    """
+    split the changes between the merged list `merged` and `new_merged` by the file each item came from.
+    items missing from `merged` go to `owner`, the file owning the list.
+    returns the items each affected file had and the ones it should have, in the order of `new_merged`
+    """
+    from collections import Counter
+
+    item_sources = [provenance.get((*path, i), owner) for i in range(len(merged))]
+    pending = Counter(map(freeze, new_merged))
+
+    old_items: dict[str, list[Any]] = {}
+    new_items: dict[str, list[Any]] = {}
+    for item, source in zip(merged, item_sources):
+        old_items.setdefault(source, []).append(item)
+        if pending[key := freeze(item)] > 0:
+            pending[key] -= 1
+            new_items.setdefault(source, []).append(item)
+
+    added = []
+    for item in new_merged:
+        if pending[key := freeze(item)] > 0:
+            pending[key] -= 1
+            added.append(item)
+    if added:
+        new_items.setdefault(owner, []).extend(added)
+
+    return {
+        source: (old_items.get(source, []), new_items.get(source, []))
+        for source in dict.fromkeys([owner, *item_sources])
+        if old_items.get(source, []) != new_items.get(source, [])
+    }
 
 
 def save_config(data: Any):
     """
-    Save a modified config on default location
+    Save a modified config on default location.
+    every changed key is routed to the file owning it in the provenance stored with the config cache. new keys go to the
+    file owning their nearest parent and values of the default config to config.yaml. only those files are read and the
+    ones whose config changed are written. the merged config and provenance stored in the config cache are patched at
+    the changed keys and only the written files are stated again. it is rebuilt when the imports change
     """
+    global _last_mtime
+    global _config_memo
 
     if not data:
         return
 
-    merged_config = read_config(False)
+    import copy
+    from archdots.utils import atomic_write
+
+    config_path = Path(CONFIG_FOLDER) / "config.yaml"
+    default_path = str(Path(MODULE_PATH) / "config.default.yaml")
+
+    # a new object is needed, callers usually modify the one returned by read_config
+    cached = load_snapshot(CONFIG_CACHE, CONFIG_CACHE_VERSION)
+    if not isinstance(cached, dict):
+        cached = copy.deepcopy(build_config_cache())
+    merged_config = cached["config"]
+    provenance: Provenance = cached["provenance"]
+    mounts: dict[str, tuple[Any, ...]] = cached["mounts"]
+    _import_expansions.update(cached["expansions"])
+
+    sources: dict[Path, SourceStat] = {}
+    contents: dict[Path, Any] = {}
+    original_contents: dict[Path, Any] = {}
+
+    def load_yaml(source: str) -> dict[Any, Any]:
+        path = Path(source)
+        if path not in contents:
+            # stat before reading, so a file changed meanwhile invalidates the cache
+            sources[path] = source_stat(path)
+            contents[path] = yaml_io.load_file(path)
+            original_contents[path] = copy.deepcopy(contents[path])
+            if not isinstance(contents[path], dict):
+                raise SettingsException(
+                    f'Invalid import. Contents of "{path}" is not a valid imported config. All imported files must contain at least one field'
+                )
+        return contents[path]
+
+    def file_path(source: str, path: tuple[Any, ...]) -> tuple[Any, ...]:
+        # key path inside `source` of the key path `path` of the merged config
+        return path[len(mounts.get(source, ())) :]
+
+    def contributors(path: tuple[Any, ...]) -> set[str]:
+        return {
+            source
+            for key_path, source in provenance.items()
+            if key_path[: len(path)] == path
+        }
+
+    # the default config is merged key by key, so its keys are copied whole to config.yaml when changed
+    changed_defaults: set[Any] = set()
+    # (kind, key path, file owning it) of each change applied to the files, patched into the cached config afterwards
+    changes: list[tuple[str, tuple[Any, ...], str]] = []
+
+    for path in changed_paths(merged_config, data):
+        if provenance.get(path[:1]) == default_path:
+            changed_defaults.add(path[0])
+            continue
 
-    with open(Path(CONFIG_FOLDER) / "config.yaml", "r") as f:
-        config = yaml.safe_load(f)
-    new_config = iterdict_imports(config, merged_config, data)
+        merged = get_in(merged_config, path[:-1])
+        new_merged = get_in(data, path[:-1])
+        if path[-1] not in new_merged:
+            for source in contributors(path):
+                delete_in(load_yaml(source), file_path(source, path))
+            changes.append(("delete", path, ""))
+        elif path[-1] not in merged:
+            parent = next(
+                path[:i] for i in range(len(path) - 1, -1, -1) if path[:i] in provenance
+            )
+            owner = provenance[parent]
+            set_in(
+                load_yaml(owner),
+                file_path(owner, path),
+                copy.deepcopy(new_merged[path[-1]]),
+            )
+            changes.append(("set", path, owner))
+        elif isinstance(merged[path[-1]], list) and isinstance(
+            new_merged[path[-1]], list
+        ):
+            owner = provenance[path]
+            for source, (old_items, new_items) in split_list(
+                path, merged[path[-1]], new_merged[path[-1]], owner, provenance
+            ).items():
+                config = load_yaml(source)
+                current = get_in(config, file_path(source, path))
+                set_in(
+                    config,
+                    file_path(source, path),
+                    reconcile_list(
+                        current if isinstance(current, list) else [],
+                        old_items,
+                        new_items,
+                    )[0],
+                )
+            changes.append(("list", path, owner))
+        else:
+            owner = provenance[path]
+            # dicts and lists may come from several files, all of them are replaced by the new value
+            for source in contributors(path) - {owner}:
+                delete_in(load_yaml(source), file_path(source, path))
+            set_in(
+                load_yaml(owner),
+                file_path(owner, path),
+                copy.deepcopy(new_merged[path[-1]]),
+            )
+            changes.append(("set", path, owner))
+
+    for k in changed_defaults:
+        if k in data:
+            load_yaml(str(config_path))[k] = copy.deepcopy(data[k])
+            changes.append(("set", (k,), str(config_path)))
+
+    written = [
+        path for path, content in contents.items() if content != original_contents[path]
+    ]
+    for path in written:
+        atomic_write(path, yaml_io.dump(contents[path]))
+        sources[path] = source_stat(path)
+
+    def drop_provenance(path: tuple[Any, ...]):
+        for key_path in [k for k in provenance if k[: len(path)] == path]:
+            del provenance[key_path]
+
+    def patch_list(path: tuple[Any, ...], owner: str) -> bool:
+        # merged lists are the lists of their files appended in merge order, starting with the owner's
+        runs: list[tuple[str, list[Any]]] = [(owner, [])]
+        for i, item in enumerate(get_in(merged_config, path)):
+            source = provenance.pop((*path, i), owner)
+            if runs[-1][0] != source:
+                runs.append((source, []))
+            runs[-1][1].append(item)
+        if len({source for source, _ in runs}) != len(runs):
+            # files imported more than once appear in several places
+            return False
+
+        new_list = []
+        for source, items in runs:
+            if Path(source) in contents:
+                items = get_in(contents[Path(source)], file_path(source, path))
+                items = copy.deepcopy(items) if isinstance(items, list) else []
+            provenance.update(
+                ((*path, len(new_list) + i), source) for i in range(len(items))
+            )
+            new_list.extend(items)
+        set_in(merged_config, path, new_list)
+        return True
+
+    def patch_cache() -> bool:
+        if any(
+            list(find_import_mounts(contents[path]))
+            != list(find_import_mounts(original_contents[path]))
+            for path in written
+        ):
+            return False
+
+        for kind, path, owner in changes:
+            if kind == "delete":
+                if len(path) == 1:
+                    # the value of the default config, if any, is merged again
+                    return False
+                drop_provenance(path)
+                delete_in(merged_config, path)
+            elif kind == "list":
+                if not patch_list(path, owner):
+                    return False
+            else:
+                value = copy.deepcopy(get_in(data, path))
+                drop_provenance(path)
+                set_in(merged_config, path, value)
+                flatten_sources(source_tree(value, owner), provenance, path)
+        return True
+
+    if not patch_cache():
+        build_config_cache(sources, contents)
+        return
 
-    with open(Path(CONFIG_FOLDER) / "config.yaml", "w") as f:
-        f.write(yaml.dump(new_config))
+    # the folders of the written files changed as well
+    source_stats = {stat[0]: stat for stat in cached["sources"]}
+    for path in written:
+        source_stats[str(path)] = sources[path]
+        folder = os.path.dirname(os.path.realpath(path))
+        if folder in source_stats:
+            source_stats[folder] = source_stat(folder)
+    for _, folder_stats in cached["expansions"].values():
+        folder_stats[:] = [source_stats.get(stat[0], stat) for stat in folder_stats]
+
+    _config_memo = merged_config
+    _last_mtime = config_path.lstat().st_mtime
+    dump_snapshot(
+        CONFIG_CACHE, CONFIG_CACHE_VERSION, list(source_stats.values()), cached
+    )
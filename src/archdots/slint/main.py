@@ -5,7 +5,7 @@ import slint
 from slint.models import ListModel
 from rich import print
 from archdots.package_manager import Custom, PackageManager, package_managers
-from archdots.settings import read_config
+from archdots.settings import read_config_view
 from archdots.package import Package
 
 pm_by_name = {pm.name: pm for pm in package_managers}
@@ -41,7 +41,8 @@ class PackageAttrs:
     @staticmethod
     def build(package_managers: list[PackageManager]):
         pkg_attrs = []
-        config = read_config()
+        config_view = read_config_view()
+        config = config_view.config
 
         for pm in package_managers:
             pm.get_installed(by_user=False)
@@ -49,12 +50,13 @@ class PackageAttrs:
         for pm_name in config["pkgs"]:
             if pm_name == "custom":
                 continue
+            installed_packages = set(pm_by_name[pm_name].get_installed(True))
 
             pkg_attrs.extend(
                 [
                     PackageAttrs(
                         name=pkg_name,
-                        installed=pkg_name in pm_by_name[pm_name].get_installed(True),
+                        installed=pkg_name in installed_packages,
                         managed=True,
                         package_manager=pm_name,
                     )
@@ -69,7 +71,7 @@ class PackageAttrs:
                         PackageAttrs(
                             name=pkg.name,
                             installed=pkg.check(supress_output=True),
-                            managed=pkg.name in config["pkgs"][pm.name],
+                            managed=pkg.name in config_view.packages_of(pm.name),
                             package_manager=pm.name,
                             description=pkg.description,
                             url=pkg.url,
@@ -93,9 +95,8 @@ class PackageAttrs:
                             managed=False,
                             package_manager=pm.name,
                         )
-                        for pkg_name in set(pm.get_installed(True)).difference(
-                            config["pkgs"][pm.name]
-                        )
+                        for pkg_name in set(pm.get_installed(True))
+                        - config_view.packages_of(pm.name)
                     ]
                 )
         return pkg_attrs
@@ -0,0 +1,244 @@
+import re
+from typing import Any
+
+NAME_REGEX = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+FUNCTION_REGEX = re.compile(r"[ \t]*\(\)[ \t\n]*\{")
+
+# characters that end an unquoted word
+WORD_END = " \t\n"
+# characters of an unquoted word that bash could expand or interpret
+DYNAMIC_CHARS = set("$`\\(<>&|;*?[]{}~")
+
+
+class NeedsBash(Exception):
+    """
+    raised when a PKGBUILD has something the static extractor does not understand
+    """
+
+
+class StaticExtractor:
+    """
+    reads the fields and functions of a PKGBUILD made only of literal assignments, comments and function declarations.
+    strings, arrays and the bodies of functions are scanned as bash would, anything else raises NeedsBash
+    """
+
+    def __init__(self, text: str, fields: list[str], func_regex: re.Pattern) -> None:
+        if "\r" in text:
+            raise NeedsBash("carriage return")
+        self.text = text
+        self.position = 0
+        self.fields = fields
+        self.func_regex = func_regex
+
+    def peek(self, offset=0) -> str:
+        position = self.position + offset
+        return self.text[position] if position < len(self.text) else ""
+
+    def extract(self) -> tuple[dict[str, Any], list[str]]:
+        values: dict[str, Any] = {}
+        funcs: set[str] = set()
+
+        while True:
+            self.skip_blanks(newlines=True)
+            if not self.peek():
+                break
+
+            if not (match := NAME_REGEX.match(self.text, self.position)):
+                raise NeedsBash(f"unexpected {self.peek()!r}")
+            name = match.group()
+            self.position = match.end()
+
+            if self.peek() == "=":
+                self.position += 1
+                value = self.array() if self.peek() == "(" else self.word()
+                self.end_of_command()
+                if name in values and type(values[name]) != type(value):
+                    raise NeedsBash(f"{name} assigned as string and array")
+                values[name] = value
+            elif name == "function" and self.peek() in " \t":
+                self.skip_blanks()
+                if not (match := NAME_REGEX.match(self.text, self.position)):
+                    raise NeedsBash("function without name")
+                self.position = match.end()
+                if self.text.startswith("()", self.position):
+                    self.position += 2
+                self.skip_blanks(newlines=True)
+                if self.peek() != "{":
+                    raise NeedsBash("function without body")
+                self.position += 1
+                self.function_body()
+                funcs.add(match.group())
+            elif match := FUNCTION_REGEX.match(self.text, self.position):
+                self.position = match.end()
+                self.function_body()
+                funcs.add(name)
+            else:
+                raise NeedsBash(f"command {name}")
+
+        fields = {
+            field: value.strip() if isinstance(value, str) else value
+            for field in self.fields
+            if (value := values.get(field)) is not None
+        }
+        # bash lists functions sorted
+        return fields, sorted(filter(self.func_regex.match, funcs))
+
+    def skip_blanks(self, newlines=False):
+        while char := self.peek():
+            if char in " \t" or (newlines and char == "\n"):
+                self.position += 1
+            elif char == "#":
+                self.skip_comment()
+            else:
+                break
+
+    def skip_comment(self):
+        end = self.text.find("\n", self.position)
+        self.position = len(self.text) if end == -1 else end
+
+    def end_of_command(self):
+        self.skip_blanks()
+        if self.peek() not in ("\n", ""):
+            raise NeedsBash("more than an assignment in a line")
+
+    def word(self, in_array=False) -> str:
+        """
+        a word made of quoted strings and literal characters, without expansions
+        """
+        parts = []
+        while (char := self.peek()) and char not in WORD_END:
+            if char == ")" and in_array:
+                break
+            if char == "'":
+                end = self.text.find("'", self.position + 1)
+                if end == -1:
+                    raise NeedsBash("unterminated string")
+                parts.append(self.text[self.position + 1 : end])
+                self.position = end + 1
+            elif char == '"':
+                parts.append(self.double_quoted())
+            elif char in DYNAMIC_CHARS:
+                raise NeedsBash(f"unquoted {char!r}")
+            else:
+                parts.append(char)
+                self.position += 1
+        return "".join(parts)
+
+    def double_quoted(self) -> str:
+        parts = []
+        self.position += 1
+        while (char := self.peek()) != '"':
+            if not char:
+                raise NeedsBash("unterminated string")
+            if char in "$`":
+                raise NeedsBash("expansion inside string")
+            if char == "\\" and self.peek(1) in '$`"\\\n':
+                if self.peek(1) != "\n":
+                    parts.append(self.peek(1))
+                self.position += 2
+                continue
+            parts.append(char)
+            self.position += 1
+        self.position += 1
+        return "".join(parts)
+
+    def array(self) -> list[str]:
+        items = []
+        self.position += 1
+        while True:
+            self.skip_blanks(newlines=True)
+            if self.peek() == ")":
+                self.position += 1
+                return items
+            if not self.peek():
+                raise NeedsBash("unterminated array")
+            items.append(self.word(in_array=True))
+
+    def function_body(self):
+        """
+        skip a function body, the opening brace included, until its closing brace
+        """
+        depth = 1
+        while depth:
+            char = self.peek()
+            if not char:
+                raise NeedsBash("unterminated function")
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+            elif char == "#" and self.text[self.position - 1] in " \t\n;|&(":
+                self.skip_comment()
+                continue
+            elif char in "'\"`" or (char == "$" and self.peek(1) == "("):
+                self.skip_quoted()
+                continue
+            elif char == "\\":
+                self.position += 1
+            elif self.text.startswith("<<", self.position):
+                raise NeedsBash("heredoc")
+            self.position += 1
+
+    def skip_quoted(self):
+        """
+        skip a quoted string, backquote or $( ) with everything nested inside it
+        """
+        char = self.peek()
+        if char == "'":
+            end = self.text.find("'", self.position + 1)
+            if end == -1:
+                raise NeedsBash("unterminated string")
+            self.position = end + 1
+            return
+
+        if char == "$":
+            self.position += 2
+            closing = ")"
+            depth = 1
+        else:
+            self.position += 1
+            closing = char
+            depth = 0
+
+        while True:
+            current = self.peek()
+            if not current:
+                raise NeedsBash("unterminated string")
+            if current == "\\":
+                self.position += 2
+                continue
+            if closing == ")":
+                if current == "(":
+                    depth += 1
+                elif current == ")":
+                    depth -= 1
+                    if not depth:
+                        self.position += 1
+                        return
+                elif current in "'\"`":
+                    self.skip_quoted()
+                    continue
+                elif self.text.startswith("<<", self.position):
+                    raise NeedsBash("heredoc")
+            elif current == closing:
+                self.position += 1
+                return
+            elif closing == '"' and (
+                current == "`" or (current == "$" and self.peek(1) == "(")
+            ):
+                self.skip_quoted()
+                continue
+            self.position += 1
+
+
+def extract_static(
+    text: str, fields: list[str], func_regex: re.Pattern
+) -> tuple[dict[str, Any], list[str]] | None:
+    """
+    returns the `fields` assigned and the functions matching `func_regex` declared by the PKGBUILD `text`,
+    the same ones bash would give. returns None when bash is needed to know them
+    """
+    try:
+        return StaticExtractor(text, fields, func_regex).extract()
+    except NeedsBash:
+        return None
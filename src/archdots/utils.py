@@ -1,5 +1,4 @@
 import os
-import inspect
 import functools
 from pathlib import Path
 from urllib.parse import urlparse
@@ -7,6 +6,9 @@ from collections.abc import Callable
 from typing import TypeVar, ParamSpec
 
 from archdots.constants import PLATFORM
+from archdots.imports import lazy_import
+
+inspect = lazy_import("inspect")
 
 
 def default_editor(file: Path | str):
@@ -29,6 +31,7 @@ class SingletonMeta(type):
 
 
 _memo = {}
+_keep_memo = False
 
 T = TypeVar("T")  # function return value
 P = ParamSpec("P")  # function parameters
@@ -55,15 +58,61 @@ def memoize(f: Callable[P, T]) -> Callable[P, T]:
         if f not in _memo:
             _memo[f] = {}
 
-        if use_memo and args in _memo[f]:
-            return _memo[f][args]
+        # calls that only differ by use_memo share the same result
+        key = tuple(
+            (name, value)
+            for name, value in bound_args.arguments.items()
+            if name != "use_memo"
+        )
+
+        if (use_memo or _keep_memo) and key in _memo[f]:
+            return _memo[f][key]
         else:
-            _memo[f][args] = f(*args, **kwargs)
-            return _memo[f][args]
+            _memo[f][key] = f(*args, **kwargs)
+            return _memo[f][key]
 
     return wrapper
 
 
+def keep_memo(enabled=True):
+    """
+    when enabled, memoized functions reuse their last result even when called with `use_memo=False`, until `clear_memo` is called.
+    used by long running processes that know when their data changed
+    """
+    global _keep_memo
+    _keep_memo = enabled
+
+
+def clear_memo():
+    _memo.clear()
+
+
+def atomic_write(path: Path | str, content: str | bytes):
+    """
+    write `content` to a temporary file beside `path` and rename it over `path`.
+    readers (including other archdots processes) never see a partially written file
+    """
+    import tempfile
+
+    # write through symlinks instead of replacing them
+    path = Path(os.path.realpath(path))
+    os.makedirs(path.parent, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb" if isinstance(content, bytes) else "w") as f:
+            f.write(content)
+        if path.exists():
+            os.chmod(tmp_path, path.stat().st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
 def is_url_valid(url):
     try:
         result = urlparse(url)
@@ -0,0 +1,40 @@
+from pathlib import Path
+from typing import Any
+
+from archdots.imports import lazy_import
+
+yaml = lazy_import("yaml")
+
+
+def loader_class():
+    """
+    libyaml loader when pyyaml was built with it, the pure python one otherwise
+    """
+    return getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader
+
+
+def dumper_class():
+    """
+    libyaml dumper when pyyaml was built with it, the pure python one otherwise.
+    both emit the same text as `yaml.dump`
+    """
+    return getattr(yaml, "CDumper", None) or yaml.Dumper
+
+
+def load(stream: Any) -> Any:
+    """
+    same as `yaml.safe_load`
+    """
+    return yaml.load(stream, Loader=loader_class())
+
+
+def load_file(path: str | Path) -> Any:
+    with open(path, "r") as f:
+        return load(f)
+
+
+def dump(data: Any) -> str:
+    """
+    same as `yaml.dump`
+    """
+    return yaml.dump(data, Dumper=dumper_class())
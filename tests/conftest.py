@@ -0,0 +1,13 @@
+import os
+import sys
+import shutil
+import atexit
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# archdots resolves its folders from HOME when imported, so the tests never touch the real config or caches
+TEST_HOME = tempfile.mkdtemp(prefix="archdots-tests-")
+atexit.register(shutil.rmtree, TEST_HOME, ignore_errors=True)
+os.environ["HOME"] = os.environ["USERPROFILE"] = TEST_HOME
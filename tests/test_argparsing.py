@@ -0,0 +1,54 @@
+import os
+import sys
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from archdots.constants import COMMANDS_FOLDER
+
+SRC_FOLDER = Path(__file__).resolve().parents[1] / "src"
+
+SHOW_ARGS = """: <<ARCHDOTS
+help: print the arguments
+arguments:
+  - name: target
+    help: target
+ARCHDOTS
+for key in "${!args[@]}"; do
+  printf '%s=%s\\n' "$key" "${args[$key]}"
+done
+"""
+
+
+@pytest.fixture
+def user_commands():
+    folder = Path(COMMANDS_FOLDER)
+    folder.mkdir(parents=True, exist_ok=True)
+    yield folder
+    shutil.rmtree(folder)
+
+
+@pytest.mark.skipif(not shutil.which("bash"), reason="shell commands need bash")
+def test_shell_command_only_gets_its_arguments(user_commands):
+    (user_commands / "extra").mkdir()
+    (user_commands / "extra" / "show.sh").write_text(SHOW_ARGS)
+
+    # the command replaces the process, so it runs in a new interpreter
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import archdots; archdots.main()",
+            "extra",
+            "show",
+            "it's",
+        ],
+        env={**os.environ, "PYTHONPATH": str(SRC_FOLDER)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.splitlines() == ["target=it's"]
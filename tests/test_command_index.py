@@ -0,0 +1,35 @@
+import os
+
+from archdots.command_index import (
+    command_tree_from_index,
+    load_command_index,
+    save_command_index,
+)
+
+
+def find_node(node, name):
+    return next(n for n in node.subcommands if n.name == name)
+
+
+def test_in_place_edit_updates_node_mtime(tmp_path):
+    root = tmp_path / "commands"
+    (root / "pkg").mkdir(parents=True)
+    command = root / "pkg" / "sync.py"
+    command.write_text("print('sync')\n")
+    os.utime(command, ns=(1_000_000_000, 1_000_000_000))
+    roots = [str(root)]
+
+    index, _ = load_command_index(roots)
+    save_command_index(roots, index)
+    tree = command_tree_from_index(roots, index, "archdots")
+    assert find_node(find_node(tree, "pkg"), "sync").mtime == 1
+
+    folder_mtime = os.stat(command.parent).st_mtime_ns
+    command.write_text("print('sync again')\n")
+    os.utime(command, ns=(2_000_000_000, 2_000_000_000))
+    assert os.stat(command.parent).st_mtime_ns == folder_mtime
+
+    index, changed = load_command_index(roots)
+    assert not changed
+    tree = command_tree_from_index(roots, index, "archdots")
+    assert find_node(find_node(tree, "pkg"), "sync").mtime == 2
@@ -0,0 +1,120 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+import archdots
+from archdots.argparsing import MetadataCache, build_command_tree, extract_metadata
+from archdots.command_index import command_tree_from_index, load_command_index
+from archdots.completion import (
+    COMPLETION_INDEX,
+    completion_lines,
+    update_completion_index,
+)
+from archdots.constants import COMMANDS_FOLDER, MODULE_PATH
+from archdots.exceptions import ParseException
+
+VALID_COMMAND = '''"""
+ARCHDOTS
+help: a valid command
+flags:
+  - long: --mode
+    help: mode
+    choices: [fast, slow]
+ARCHDOTS
+"""
+'''
+
+MALFORMED_COMMANDS = {
+    # dacite MissingValueError
+    "missing_help.py": '"""\nARCHDOTS\narguments: []\nARCHDOTS\n"""\n',
+    # yaml error
+    "bad_yaml.py": '"""\nARCHDOTS\nhelp: [unclosed\nARCHDOTS\n"""\n',
+    # not a mapping
+    "not_mapping.sh": "# ARCHDOTS\n# just text\n# ARCHDOTS\n",
+}
+
+
+@pytest.fixture
+def user_commands():
+    folder = Path(COMMANDS_FOLDER)
+    folder.mkdir(parents=True, exist_ok=True)
+    yield folder
+    shutil.rmtree(folder)
+
+
+@pytest.mark.parametrize("filename", MALFORMED_COMMANDS)
+def test_malformed_metadata_raises_parse_exception(tmp_path, filename):
+    path = tmp_path / filename
+    path.write_text(MALFORMED_COMMANDS[filename])
+    with pytest.raises(ParseException):
+        extract_metadata(path)
+
+
+def test_completion_skips_malformed_commands(tmp_path):
+    root = tmp_path / "commands"
+    root.mkdir()
+    (root / "valid.py").write_text(VALID_COMMAND)
+    for filename, content in MALFORMED_COMMANDS.items():
+        (root / filename).write_text(content)
+
+    tree = build_command_tree([str(root)], "archdots")
+    keys = [line.split("\t")[0] for line in completion_lines(tree, extract_metadata)]
+
+    assert "valid" in keys
+    assert "valid --mode" in keys
+    assert not {"missing_help", "bad_yaml", "not_mapping"} & set(keys)
+
+
+def test_dispatch_with_malformed_command(user_commands):
+    # only the completion index reads the metadata of commands outside the argv path
+    (user_commands / "extra").mkdir()
+    (user_commands / "extra" / "broken.py").write_text(
+        MALFORMED_COMMANDS["missing_help.py"]
+    )
+    COMPLETION_INDEX.unlink(missing_ok=True)
+
+    assert archdots.dispatch(["--info"]) == 0
+    assert COMPLETION_INDEX.exists()
+
+
+def completion_index_lines() -> list[str]:
+    return COMPLETION_INDEX.read_text().splitlines()
+
+
+def test_in_place_edit_updates_completion_index(user_commands):
+    command = user_commands / "extra" / "edited.py"
+    command.parent.mkdir()
+    command.write_text(VALID_COMMAND)
+    archdots.dispatch(["--info"])
+    assert "extra edited --mode\t\t\tfast slow" in completion_index_lines()
+
+    folder_mtime = os.stat(command.parent).st_mtime_ns
+    command.write_text(VALID_COMMAND.replace("[fast, slow]", "[quick, careful]"))
+    assert os.stat(command.parent).st_mtime_ns == folder_mtime
+
+    # the edited command is not on the argv path
+    archdots.dispatch(["--info"])
+    assert "extra edited --mode\t\t\tquick careful" in completion_index_lines()
+
+
+def test_unchanged_commands_reuse_their_lines(user_commands, monkeypatch):
+    (user_commands / "first.py").write_text(VALID_COMMAND)
+    (user_commands / "second.py").write_text(VALID_COMMAND)
+    archdots.dispatch(["--info"])
+    lines = completion_index_lines()
+
+    read = []
+    monkeypatch.setattr(
+        MetadataCache,
+        "get",
+        lambda self, path: read.append(path) or extract_metadata(path),
+    )
+    (user_commands / "second.py").write_text(VALID_COMMAND + "\n")
+    roots = [str(Path(MODULE_PATH) / "commands"), str(user_commands)]
+    tree = command_tree_from_index(roots, load_command_index(roots)[0], "archdots")
+    update_completion_index(tree, MetadataCache().get)
+
+    assert read == [user_commands / "second.py"]
+    assert completion_index_lines() == lines
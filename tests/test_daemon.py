@@ -0,0 +1,34 @@
+import archdots
+from archdots import argparsing, daemon
+from archdots.daemon import changes_state
+
+
+def test_changes_state():
+    assert changes_state(["pkg", "sync"])
+    assert changes_state(["health", "configure"])
+    assert changes_state(["sync"])
+    assert not changes_state(["pkg", "list", "pending"])
+    assert not changes_state(["settings", "dump"])
+    assert not changes_state([])
+
+
+def test_read_only_command_keeps_daemon_cache(monkeypatch, capsys):
+    invalidated = []
+    monkeypatch.setattr(daemon, "invalidate_daemon", lambda: invalidated.append(1))
+
+    assert archdots.dispatch(["completion", "fish"]) == 0
+    assert "complete -c dots" in capsys.readouterr().out
+    assert not invalidated
+
+
+def test_shell_command_invalidates_daemon_before_exec(monkeypatch):
+    calls = []
+    monkeypatch.setattr(daemon, "invalidate_daemon", lambda: calls.append("invalidate"))
+    monkeypatch.setattr(
+        argparsing,
+        "exec_command",
+        lambda script_path, args_dict: calls.append(("exec", args_dict)) or 0,
+    )
+
+    assert archdots.dispatch(["sync"]) == 0
+    assert calls == ["invalidate", ("exec", {"type": None})]
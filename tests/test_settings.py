@@ -0,0 +1,112 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from archdots import settings, yaml_io
+from archdots.cache import load_snapshot
+from archdots.constants import CONFIG_FOLDER
+from archdots.settings import (
+    CONFIG_CACHE,
+    CONFIG_CACHE_VERSION,
+    build_config_cache,
+    clear_config_memo,
+    read_config,
+    save_config,
+)
+
+CONFIG_FILES = {
+    "config.yaml": """
+import: ./fragments
+editor: vim
+pkgs:
+  import: ./pkgs.yaml
+  pacman:
+    - git
+""",
+    "pkgs.yaml": """
+pacman:
+  - zsh
+yay:
+  - code
+""",
+    "fragments/a.yaml": """
+theme:
+  name: dark
+  size: 12
+""",
+    "fragments/b.yaml": """
+fonts:
+  - mono
+""",
+}
+
+
+@pytest.fixture
+def config_folder():
+    folder = Path(CONFIG_FOLDER)
+    for name, content in CONFIG_FILES.items():
+        (folder / name).parent.mkdir(parents=True, exist_ok=True)
+        (folder / name).write_text(content.lstrip())
+    CONFIG_CACHE.unlink(missing_ok=True)
+    clear_config_memo()
+    yield folder
+    shutil.rmtree(folder)
+    CONFIG_CACHE.unlink(missing_ok=True)
+    clear_config_memo()
+
+
+def snapshot() -> dict:
+    cached = load_snapshot(CONFIG_CACHE, CONFIG_CACHE_VERSION)
+    assert isinstance(cached, dict), "the config cache was invalidated"
+    return {k: cached[k] for k in ("config", "imports", "provenance", "mounts")}
+
+
+def rebuilt() -> dict:
+    clear_config_memo()
+    cached = build_config_cache()
+    return {k: cached[k] for k in ("config", "imports", "provenance", "mounts")}
+
+
+def test_save_config_patches_the_cache(config_folder, monkeypatch):
+    config = read_config(False)
+    monkeypatch.setattr(settings, "build_config_cache", None)
+    config["pkgs"]["pacman"] = ["git", "vim"]
+    config["pkgs"]["yay"].append("spotify")
+    config["theme"]["size"] = 14
+    del config["theme"]["name"]
+    config["fonts"].append("serif")
+    config["pager"] = "less"
+    save_config(config)
+
+    patched = snapshot()
+    assert read_config() == config
+    monkeypatch.undo()
+    assert patched == rebuilt()
+
+
+def test_save_config_reads_only_the_changed_files(config_folder, monkeypatch):
+    config = read_config(False)
+    loaded = []
+    load_file = yaml_io.load_file
+    monkeypatch.setattr(
+        yaml_io, "load_file", lambda path: loaded.append(Path(path)) or load_file(path)
+    )
+
+    config["theme"]["size"] = 14
+    save_config(config)
+
+    assert loaded == [(config_folder / "fragments/a.yaml").resolve()]
+    assert snapshot()["config"] == config
+    assert read_config(False) == config
+
+
+def test_save_config_rebuilds_when_imports_change(config_folder):
+    config = read_config(False)
+    del config["editor"]
+    del config["pkgs"]
+    save_config(config)
+
+    assert snapshot() == rebuilt()
+    assert "pkgs" not in read_config(False)
+    assert settings._config_memo == read_config(False)
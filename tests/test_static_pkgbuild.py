@@ -0,0 +1,296 @@
+import shutil
+
+import pytest
+
+from archdots.package import (
+    package_from_fields,
+    parse_package_static,
+    parse_packages_bash,
+)
+from archdots.pkgbuild_templates import health_pkgbuild, package_pkgbuild
+
+pytestmark = pytest.mark.skipif(
+    not shutil.which("bash"), reason="bash is the reference parser"
+)
+
+TEMPLATE_CORPUS = {
+    "pkg-new": package_pkgbuild(
+        "pkg-new",
+        "a custom package",
+        "https://github.com/AlanJs26/dots",
+        ["pacman:git", "yay:visual-studio-code-bin"],
+        ["https://github.com/AlanJs26/dots.git", "https://example.com/a.tar.gz"],
+        "linux",
+    ),
+    "pkg-new-empty": package_pkgbuild(
+        "pkg-new-empty", "no dependencies", "https://example.com", [], [], "linux"
+    ),
+    "pkg-new-quotes": package_pkgbuild(
+        "pkg-new-quotes",
+        'it\'s "quoted", $HOME `and` \\ escaped',
+        "https://example.com/?q='a b'",
+        ["pacman:it's"],
+        ["https://example.com/a b.zip"],
+        "windows",
+    ),
+    "health-new": health_pkgbuild(
+        "health-new", "it's configured", ["custom:pkg-new"], "linux"
+    ),
+    "health-new-empty": health_pkgbuild("health-new-empty", "nothing", [], "linux"),
+}
+
+STATIC_CORPUS = {
+    "double-quotes": """
+description="escaped \\"quotes\\", \\$dollar and \\\\ backslash"
+url="https://example.com/a?b=c"
+depends=("pacman:git" 'pacman:vim' pacman:zsh)
+source=()
+source_on_check=true
+check() { which git; }
+install() { sudo pacman -S git; }
+uninstall() { sudo pacman -R git; }
+""",
+    "multiline-arrays": """
+# comments with 'quotes" and { braces
+description=plain-word
+url=https://example.com/plain
+depends=(
+    'pacman:git'   # inline comment
+    # a commented out 'pacman:vim'
+    "pacman:a b"
+    pacman:c#not-a-comment
+)
+source=('https://example.com/a.zip'
+        'https://example.com/b.zip')
+function check {
+    [[ -f "${HOME}/.config/app" ]] && return 0
+    return 1
+}
+function install() {
+    local files=( "$(ls "$PKGPATH" | grep -v ')')" )
+    for file in "${files[@]}"; do
+        if [ "${#file}" -gt 0 ]; then echo "{$file}"; fi
+    done
+    echo `echo "}"` '}' "}"
+}
+uninstall()
+{
+    case "$1" in
+        a) echo a ;;
+    esac
+}
+install_deps() { :; }
+helper() { :; }
+""",
+    "reassigned": """
+description='first'
+description='second'
+url=''
+depends=('pacman:a')
+depends=()
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+check() { return 1; }
+""",
+    "empty-strings": """
+description=''
+url=""
+depends=('')
+source=("")
+platform=linux
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "concatenated-words": """
+description='half'"-and-"half
+url=https://'example.com'/"path"
+depends=(pacman:'git' "pacman:"vim)
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "tabs-and-blank-lines": """
+
+
+description='tabs'\t# trailing comment
+url=''
+depends=(\t'pacman:a'\t\t'pacman:b'\t)
+
+source=()
+check()\t{ :; }
+install() {
+\techo "tabbed"
+}
+uninstall() { :; }
+""",
+    "escaped-newline": """
+description="first line \\
+continues"
+url=''
+depends=()
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "nested-braces": """
+description='nested'
+url=''
+depends=()
+source=()
+check() {
+    if true; then { echo "{"; }; fi
+    x=${HOME:-"}"}
+}
+install() {
+    printf '%s\\n' "${sourced[@]}" | while read -r f; do { echo "$f"; }; done
+}
+uninstall() { echo $(( 1 + 2 )) '{' "}"; }
+""",
+    "no-trailing-newline": "description='x'\nurl=''\ndepends=()\nsource=()\ncheck() { :; }\ninstall() { :; }\nuninstall() { :; }",
+    "missing-functions": """
+description='only some functions'
+url=''
+depends=()
+source=()
+install() { :; }
+""",
+}
+
+DYNAMIC_CORPUS = {
+    "variable": """
+pkgname=app
+description='uses a variable'
+url="https://example.com/$pkgname"
+depends=()
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "command-substitution": """
+description="$(echo generated)"
+url=''
+depends=($(echo pacman:git))
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "backquotes": """
+description=`echo generated`
+url=''
+depends=()
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "command": """
+description='runs a command'
+url=''
+depends=()
+[[ -f /etc/arch-release ]] && depends+=('pacman:git')
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "append": """
+description='appends'
+url=''
+depends=('pacman:a')
+depends+=('pacman:b')
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "heredoc": """
+description='has a heredoc'
+url=''
+depends=()
+source=()
+check() { :; }
+install() {
+    cat <<EOF
+}
+EOF
+}
+uninstall() { :; }
+""",
+    "brace-expansion": """
+description='braces'
+url=''
+depends=(pacman:{a,b})
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "tilde": """
+description='home'
+url=~/app
+depends=()
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+    "two-commands-in-a-line": """
+description='a'; url=''
+depends=()
+source=()
+check() { :; }
+install() { :; }
+uninstall() { :; }
+""",
+}
+
+
+def write_corpus(folder, corpus):
+    paths = {}
+    for name, text in corpus.items():
+        (folder / name).mkdir(parents=True)
+        paths[name] = folder / name / "PKGBUILD"
+        paths[name].write_text(text)
+    return paths
+
+
+@pytest.fixture(scope="module")
+def static_pkgbuilds(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("static")
+    paths = write_corpus(folder, {**TEMPLATE_CORPUS, **STATIC_CORPUS})
+    return paths, parse_packages_bash(list(paths.values()))
+
+
+@pytest.mark.parametrize("name", [*TEMPLATE_CORPUS, *STATIC_CORPUS])
+def test_static_parser_matches_bash(static_pkgbuilds, name):
+    paths, bash_parsed = static_pkgbuilds
+    path = paths[name]
+
+    static_parsed = parse_package_static(path)
+
+    assert static_parsed is not None, "left to bash"
+    assert static_parsed == bash_parsed[path]
+
+
+@pytest.mark.parametrize("name", TEMPLATE_CORPUS)
+def test_templates_build_the_same_package(static_pkgbuilds, name):
+    paths, bash_parsed = static_pkgbuilds
+    path = paths[name]
+
+    assert package_from_fields(
+        path.parent, *parse_package_static(path)  # type: ignore
+    ) == package_from_fields(path.parent, *bash_parsed[path])
+
+
+@pytest.mark.parametrize("name", DYNAMIC_CORPUS)
+def test_dynamic_pkgbuilds_are_left_to_bash(tmp_path, name):
+    path = write_corpus(tmp_path, {name: DYNAMIC_CORPUS[name]})[name]
+
+    assert parse_package_static(path) is None